@@ -4,9 +4,9 @@ import dataclasses
 import functools
 from collections import Counter
 from dataclasses import dataclass, field
-from typing import TYPE_CHECKING, Any, Optional
+from typing import TYPE_CHECKING, Any, Optional, Sequence
 
-from .enums import EntityId, PaintColor, ToppingId
+from .enums import EntityId, OperationId, PaintColor, ToppingId
 from .models import Position
 
 if TYPE_CHECKING:
@@ -45,6 +45,12 @@ _BURGER_PARTS = {
     EntityId.PICKLE,
     EntityId.TOMATO,
 }
+_COOK_OPERATIONS = {
+    OperationId.COOK_FRYER,
+    OperationId.COOK_MICROWAVE,
+    OperationId.COOK_GRILL,
+}
+
 _STACK_WHITELIST = {
     EntityId.TRAY: _TRAY_WHITELIST,
     EntityId.MULTITRAY: _TRAY_WHITELIST,
@@ -70,7 +76,16 @@ class Entity:
 
     position: Position = Position(-1, -1)
 
+    # number of each type of cook operation in self.operations (kept in sync by
+    # add_operation())
+    _cook_counts: dict[OperationId, int] = field(
+        init=False, repr=False, default_factory=dict
+    )
+
     def __post_init__(self) -> None:
+        for op in self.operations:
+            if op.id in _COOK_OPERATIONS:
+                self._cook_counts[op.id] = self._cook_counts.get(op.id, 0) + 1
         # TODO: this is just to make sure I implement things right, and should be removed once testing is done
         if self.id in (
             EntityId.MULTITRAY,
@@ -82,16 +97,19 @@ class Entity:
             assert self.__class__ is not Entity, "code mistake: must use subclasses"
 
     def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({', '.join(self._repr_fields())})"
+
+    def _repr_fields(self) -> list[str]:
         include_id = self.__class__ is Entity
-        field_descs = [
+        return [
             f"{f.name}={value!r}"
             for f in dataclasses.fields(self)
             for value in [getattr(self, f.name)]
-            if (value or value == 0)
+            if f.repr
+            and (value or value == 0)
             and value != Position(-1, -1)
             and (include_id or f.name != "id")
         ]
-        return f"{self.__class__.__name__}({', '.join(field_descs)})"
 
     def _compare_key(self) -> tuple[Any, ...]:
         return (self.id, self.operations, self.stack)
@@ -106,6 +124,16 @@ class Entity:
             return NotImplemented
         return self._compare_key() < other._compare_key()
 
+    def add_operation(self, op: Operation) -> None:
+        """Record an operation performed on this entity."""
+        self.operations.append(op)
+        if op.id in _COOK_OPERATIONS:
+            self._cook_counts[op.id] = self._cook_counts.get(op.id, 0) + 1
+
+    def cook_count(self, op_id: OperationId) -> int:
+        """Return how many times this entity has been cooked with op_id."""
+        return self._cook_counts.get(op_id, 0)
+
     def dump_state(self) -> tuple[Any, ...]:
         """Get the state of this entity as a hashable object for cycle detection."""
         op_state = tuple(op.dump() for op in self.operations)
@@ -224,19 +252,37 @@ class Cup(Entity):
             del self.contents[fluid]
 
 
+def pack_colors(colors: Sequence[PaintColor]) -> int:
+    """Pack a list of cup paint colors (from top to bottom) into an int, with 8
+    bits per cell and the top cell in the lowest byte.
+    """
+    packed = 0
+    for i, color in enumerate(colors):
+        packed |= color.value << (8 * i)
+    return packed
+
+
 @dataclass(eq=False, repr=False)
 class PaintableCup(Cup):
     """Paintable cup for Soda Trench."""
 
     id: EntityId = EntityId.CUP
-    # cup paint colors, from top to bottom
-    colors: list[PaintColor] = field(default_factory=lambda: [PaintColor.WHITE] * 3)
+    # cup paint colors from top to bottom, packed with pack_colors()
+    colors: int = field(default=pack_colors([PaintColor.WHITE] * 3), repr=False)
+
+    def _repr_fields(self) -> list[str]:
+        colors = [self.get_color(i) for i in range(3)]
+        return [*super()._repr_fields(), f"colors={colors!r}"]
+
+    def get_color(self, index: int) -> PaintColor:
+        """Return the paint color of a single cell, counting from the top."""
+        return PaintColor((self.colors >> (8 * index)) & 0xFF)
 
     def _compare_key(self) -> tuple[Any, ...]:
         return (*super()._compare_key(), self.colors)
 
     def dump_state(self) -> tuple[Any, ...]:
-        return (*super().dump_state(), tuple(self.colors))
+        return (*super().dump_state(), self.colors)
 
 
 @dataclass(eq=False, repr=False)
@@ -12,6 +12,7 @@ from .entities import (
     SushiBowl,
     SushiPlate,
     WingPlaceholder,
+    pack_colors,
 )
 from .enums import EntityId, LevelId, ModuleId, PaintColor, ToppingId
 from .operations import (
@@ -288,7 +289,7 @@ LEVELS = [
                 PaintableCup(
                     stack=Entity(E.LID),
                     contents=Counter({T.COLA: 2}),
-                    colors=[color_1, PaintColor.WHITE, color_2],
+                    colors=pack_colors([color_1, PaintColor.WHITE, color_2]),
                 )
             )
             for i, (color_2, color_1) in enumerate(
@@ -21,16 +21,16 @@ class Direction(Enum):
         return f"{self.__class__.__name__}.{self.name}"
 
     def right(self) -> Direction:
-        return Direction((self.value - 1) % 4)
+        return _ROTATED[self][1]
 
     def left(self) -> Direction:
-        return Direction((self.value + 1) % 4)
+        return _ROTATED[self][3]
 
     def back(self) -> Direction:
-        return Direction((self.value + 2) % 4)
+        return _ROTATED[self][2]
 
     def relative_to(self, base: Direction) -> RelativeDirection:
-        return RelativeDirection((self.value - base.value) % 4)
+        return _RELATIVE[self, base]
 
 
 @unique
@@ -44,6 +44,17 @@ class RelativeDirection(Enum):
         return f"{self.__class__.__name__}.{self.name}"
 
 
+# there are only four directions, so precompute all the rotations rather than
+# going through the Enum constructor every time
+# _ROTATED[d][n] is d rotated clockwise by n quarter turns
+_ROTATED = {d: tuple(Direction((d.value - n) % 4) for n in range(4)) for d in Direction}
+_RELATIVE = {
+    (d, base): RelativeDirection((d.value - base.value) % 4)
+    for d in Direction
+    for base in Direction
+}
+
+
 class Position(NamedTuple):
     # origin is at lower left corner
     column: int
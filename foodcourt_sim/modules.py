@@ -1,8 +1,22 @@
 from __future__ import annotations
 
 import dataclasses
+import functools
 from dataclasses import InitVar, dataclass, field
-from typing import TYPE_CHECKING, Any, NamedTuple, Optional, Sequence, Type, Union
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    ClassVar,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Type,
+    TypeVar,
+    Union,
+    cast,
+)
 
 from . import logger
 from .entities import (
@@ -34,12 +48,14 @@ from .errors import (
 from .models import Direction, RelativeDirection
 from .operations import (
     CoatFluid,
+    CookFryer,
+    CookGrill,
+    CookMicrowave,
     DispenseFluid,
     DispenseFluidMixed,
     DispenseTopping,
     Dock,
     Flatten,
-    Operation,
 )
 
 if TYPE_CHECKING:
@@ -63,22 +79,36 @@ def OutJack(name: str) -> Jack:
     return Jack(name, JackDirection.OUT)
 
 
-@dataclass(init=False)
-class Signals:
-    # signal values to use while evaluating the current tick
-    values: list[bool] = field(init=False)
-    # signal values to use for the next tick
-    next_values: list[bool] = field(init=False)
+_popcount: Callable[[int], int]
+if hasattr(int, "bit_count"):
+    _popcount = int.bit_count  # Python 3.10+
+else:
 
-    def __init__(self, num_jacks: int):
-        self.values = [False] * num_jacks
-        self.next_values = self.values.copy()
+    def _popcount(value: int) -> int:
+        """Return the number of set bits in value."""
+        return bin(value).count("1")
+
+
+def _lowest_bit_index(value: int) -> int:
+    """Return the index of the lowest set bit in value."""
+    return (value & -value).bit_length() - 1
+
+
+_T = TypeVar("_T")
+
+
+def _by_entity_value(mapping: Mapping[EntityId, _T], default: _T) -> tuple[_T, ...]:
+    """Convert a mapping keyed by EntityId into a tuple indexed by EntityId value."""
+    table = [default] * (max(eid.value for eid in EntityId) + 1)
+    for eid, value in mapping.items():
+        table[eid.value] = value
+    return tuple(table)
 
-    def update(self) -> None:
-        """Advance to the next tick and clear all pending signals."""
-        self.values = self.next_values
-        self.next_values = [False] * len(self.values)
 
+_NO_DIRECTIONS: frozenset[RelativeDirection] = frozenset()
+_BACK_ONLY = frozenset({RelativeDirection.BACK})
+_FRONT_AND_BACK = frozenset({RelativeDirection.FRONT, RelativeDirection.BACK})
+_ALL_DIRECTIONS = frozenset(RelativeDirection)
 
 _MOVE_PRIORITY = [
     RelativeDirection.BACK,
@@ -90,7 +120,7 @@ _MOVE_PRIORITY = [
 
 @dataclass
 class Module:
-    _input_directions = {RelativeDirection.BACK}
+    _input_directions: ClassVar[frozenset[RelativeDirection]] = _BACK_ONLY
     rack_width = 1
     on_rack = True
     on_floor = True
@@ -104,14 +134,49 @@ class Module:
     floor_position: Position
     direction: Direction
 
-    signals: Signals = field(init=False, repr=False)
+    # signal values to use while evaluating the current tick, as a bitmask indexed
+    # by jack
+    signal_values: int = field(init=False, repr=False, default=0)
+    # signal values to use for the next tick, as a bitmask indexed by jack
+    next_signal_values: int = field(init=False, repr=False, default=0)
 
     def __post_init__(self, level: Level) -> None:
         del level
-        self.signals = Signals(len(self.jacks) if self.on_rack else 0)
+        # the positions are fixed after construction, so the hash can be cached
+        self._hash = hash((self.id.value, self.floor_position, self.rack_position))
+        self._floor_row = self.floor_position.row
+        self._floor_column = self.floor_position.column
+        # neighboring position and directions, relative to the module's direction
+        self._front_position = self.floor_position.shift_by(self.direction)
+        self._left_direction = self.direction.left()
+        self._right_direction = self.direction.right()
+        # jack lookup tables, since self.jacks is fixed after construction
+        jacks = self.jacks if self.on_rack else []
+        self._jack_index = {jack.name: i for i, jack in enumerate(jacks)}
+        self._input_indices = tuple(
+            i for i, jack in enumerate(jacks) if jack.direction is JackDirection.IN
+        )
+        self._output_indices = tuple(
+            i for i, jack in enumerate(jacks) if jack.direction is JackDirection.OUT
+        )
+        self._input_mask = sum(1 << i for i in self._input_indices)
+        # index of this module's first jack among all the jacks in a State (used
+        # to track visited jacks during signal propagation)
+        self.jack_offset = 0
+        # the module and jack connected to each jack, filled in by State
+        self.wire_targets: list[Optional[tuple[Module, int]]] = [None] * len(jacks)
+        # move priority for each incoming direction (None if not allowed)
+        self._move_priority_by_incoming: dict[Direction, Optional[int]] = {}
+        for direction in Direction:
+            rel_dir = direction.back().relative_to(self.direction)
+            self._move_priority_by_incoming[direction] = (
+                _MOVE_PRIORITY.index(rel_dir)
+                if rel_dir in self._input_directions
+                else None
+            )
 
     def __hash__(self) -> int:
-        return hash((self.id.value, self.floor_position, self.rack_position))
+        return self._hash
 
     def _str_parts(self) -> dict[str, str]:
         parts = {}
@@ -126,8 +191,9 @@ class Module:
         parts = ", ".join(f"{k}={v}" for k, v in self._str_parts().items())
         return f"{self.__class__.__name__}({parts})"
 
-    def copy(self, level: Level) -> Module:
-        return dataclasses.replace(self, level=level)
+    def copy(self, level: Level, **changes: Any) -> Module:
+        """Return a fresh copy of this module, optionally with some fields changed."""
+        return dataclasses.replace(self, level=level, **changes)
 
     def emergency_stop(self, message: str, *extra_positions: Position) -> EmergencyStop:
         return EmergencyStop(message, self.floor_position, *extra_positions)
@@ -149,7 +215,6 @@ class Module:
             ):
                 raise InvalidSolutionError("Rack position out-of-bounds")
 
-        assert len(self.signals.values) == len(self.jacks)
         if not self.on_rack:
             assert (
                 not self.jacks
@@ -158,81 +223,81 @@ class Module:
     def _get_signal(self, key: Union[str, int]) -> bool:
         """Return the current signal value on an input jack."""
         assert self.on_rack, "called _get_signal on non-rack module"
-        if isinstance(key, str):
-            idx = next(i for i, jack in enumerate(self.jacks) if jack.name == key)
-        else:
-            idx = key
+        idx = self._jack_index[key] if isinstance(key, str) else key
         assert (
             self.jacks[idx].direction is JackDirection.IN
         ), f"tried to get value of output jack {key}"
-        return self.signals.values[idx]
+        return bool((self.signal_values >> idx) & 1)
 
     def _get_signals(self) -> list[bool]:
         """Return the current signal values for all input jacks."""
         assert self.on_rack, "called _get_signals on non-rack module"
-        return [
-            value
-            for value, jack in zip(self.signals.values, self.jacks)
-            if jack.direction is JackDirection.IN
-        ]
+        values = self.signal_values
+        return [bool((values >> i) & 1) for i in self._input_indices]
 
     def _get_signal_count(self) -> int:
         """Return the number of currently active input signals."""
-        return sum(self._get_signals())
+        return _popcount(self.signal_values & self._input_mask)
 
     def _set_signal(
         self,
         key: Union[str, int],
         value: bool,
         state: State,
-        seen: Optional[set[tuple[Module, int]]] = None,
-    ) -> None:
-        """Set the signal value on an output jack for the next tick."""
+        seen: Optional[bytearray] = None,
+    ) -> Optional[bytearray]:
+        """Set the signal value on an output jack for the next tick.
+
+        Returns the visited jack buffer, which is only allocated once the signal
+        actually propagates over a wire, so it can be shared with later calls.
+        """
         assert self.on_rack, "called _set_signal on non-rack module"
-        if isinstance(key, str):
-            idx = next(i for i, jack in enumerate(self.jacks) if jack.name == key)
-        else:
-            idx = key
+        idx = self._jack_index[key] if isinstance(key, str) else key
         assert (
             self.jacks[idx].direction is JackDirection.OUT
         ), f"tried to set value of input jack {key}"
-        prev_value = self.signals.next_values[idx]
-        self.signals.next_values[idx] = value
-        if value != prev_value and (self, idx) in state.wire_map:
-            other, other_idx = state.wire_map[self, idx]
+        next_values = self.next_signal_values
+        prev_value = bool((next_values >> idx) & 1)
+        self.next_signal_values = (next_values & ~(1 << idx)) | (int(value) << idx)
+        if value == prev_value:
+            return seen
+        wire_target = self.wire_targets[idx]
+        if wire_target is not None:
+            other, other_idx = wire_target
             if seen is None:
-                seen = set()
-            if (other, other_idx) not in seen:
+                seen = bytearray(state.num_jacks)
+            if not seen[other.jack_offset + other_idx]:
                 # pylint: disable-next=protected-access  # other is always a Module
                 other._set_input_signal(other_idx, value, state, seen)
+        return seen
 
     def _set_input_signal(
-        self, idx: int, value: bool, state: State, seen: set[tuple[Module, int]]
+        self, idx: int, value: bool, state: State, seen: bytearray
     ) -> None:
         """Used by Multimixers to propagate signals immediately."""
         del state
         assert self.jacks[idx].direction is JackDirection.IN
-        self.signals.next_values[idx] = value
-        seen.add((self, idx))
+        next_values = self.next_signal_values
+        self.next_signal_values = (next_values & ~(1 << idx)) | (int(value) << idx)
+        seen[self.jack_offset + idx] = 1
 
     def _set_signals(
         self,
         values: Sequence[bool],
         state: State,
-        seen: Optional[set[tuple[Module, int]]] = None,
+        seen: Optional[bytearray] = None,
     ) -> None:
         """Set the signal values on a set of output jacks for the next tick."""
-        output_jack_indices = [
-            i
-            for i, jack in enumerate(self.jacks)
-            if jack.direction is JackDirection.OUT
-        ]
+        output_jack_indices = self._output_indices
         if len(output_jack_indices) != len(values):
             raise ValueError("slice and values lengths don't match")
-        if seen is None:
-            seen = set()
         for i, value in zip(output_jack_indices, values):
-            self._set_signal(i, value, state, seen)
+            seen = self._set_signal(i, value, state, seen)
+
+    def commit_signals(self) -> None:
+        """Advance to the next tick and clear all pending signals."""
+        self.signal_values = self.next_signal_values
+        self.next_signal_values = 0
 
     def dump_state(self) -> tuple[Any, ...]:
         """Get the internal state of this module for use in cycle detection."""
@@ -241,6 +306,30 @@ class Module:
     def debug_str(self) -> str:
         return ""
 
+    def _entity_here(self, state: State) -> Optional[Entity]:
+        """Retrieve the entity on this module's floor position, if any."""
+        ents = state.grid[self._floor_row][self._floor_column]
+        if not ents:
+            return None
+        assert len(ents) == 1, f"multiple entities at {self.floor_position}"
+        return ents[0]
+
+    def _has_entity(self, state: State) -> bool:
+        """Return whether there is an entity on this module's floor position."""
+        return bool(state.grid[self._floor_row][self._floor_column])
+
+    def _has_input_signal(self) -> bool:
+        """Return whether any input signals are currently active."""
+        return bool(self.signal_values & self._input_mask)
+
+    def wants_tick(self, state: State) -> bool:
+        """Return whether tick() could have any effect on the current tick.
+
+        Used by the simulator to skip idle modules. The default is to always tick.
+        """
+        del state
+        return True
+
     def tick(self, state: State) -> None:
         """Update internal state and act on entities based on the current tick.
 
@@ -270,17 +359,18 @@ class Module:
         existing entities on this module.
         """
         del state, ignore_collisions, dry_run
-        ordering = []
+        best_move = None
+        best_priority = len(_MOVE_PRIORITY)
         for move in moves:
-            rel_dir = move.direction.back().relative_to(self.direction)
-            if rel_dir not in self._input_directions:
+            priority = self._move_priority_by_incoming[move.direction]
+            if priority is None:
                 raise self.emergency_stop(
                     "Products cannot enter from this direction.", move.source
                 )
-            ordering.append((_MOVE_PRIORITY.index(rel_dir), move))
-        if len(moves) == 1:
-            return moves[0]
-        return min(ordering)[1]
+            if priority < best_priority:
+                best_priority = priority
+                best_move = move
+        return best_move
 
     def update_signals(self, state: State) -> None:
         """Update the output signals based on the current tick.
@@ -292,9 +382,29 @@ class Module:
 # Module subclasses
 
 
+_M = TypeVar("_M", bound=Module)
+
+_MODULE_REGISTRY: dict[ModuleId, Type[Module]] = {}
+
+
+def _register_module(cls: Type[_M]) -> Type[_M]:
+    """Class decorator that adds a Module subclass to the module lookup table."""
+    # pylint: disable-next=protected-access
+    for module_id in cls._MODULE_IDS:  # type: ignore  # dynamically checked
+        assert isinstance(module_id, ModuleId), f"bad _MODULE_IDS for {cls}"
+        assert (
+            module_id not in _MODULE_REGISTRY
+        ), f"{module_id} is claimed by {_MODULE_REGISTRY[module_id]} and {cls}"
+        _MODULE_REGISTRY[module_id] = cls
+    return cls
+
+
+@_register_module
 class Scanner(Module):
-    _MODULE_IDS = [ModuleId(ModuleId.SCANNER_BASE.value + id.value) for id in LevelId]
-    _input_directions = set()  # type: ignore
+    _MODULE_IDS = tuple(
+        ModuleId(ModuleId.SCANNER_BASE.value + id.value) for id in LevelId
+    )
+    _input_directions = _NO_DIRECTIONS
     rack_width = 2
     price = 20
 
@@ -305,17 +415,18 @@ class Scanner(Module):
         super().__post_init__(level)
 
     def update_signals(self, state: State) -> None:
-        target = state.get_entity(self.floor_position.shift_by(self.direction))
+        target = state.get_entity(self._front_position)
         enable = target is not None and target.id in (EntityId.TRAY, EntityId.MULTITRAY)
         if enable:
             self._set_signals([enable, *state.order_signals], state)
 
 
+@_register_module
 class MainInput(Module):
-    _MODULE_IDS = [
+    _MODULE_IDS = tuple(
         ModuleId(ModuleId.MAIN_INPUT_BASE.value + id.value) for id in LevelId
-    ]
-    _input_directions = set()  # type: ignore
+    )
+    _input_directions = _NO_DIRECTIONS
     rack_width = 2
 
     def __post_init__(self, level: Level) -> None:
@@ -347,13 +458,43 @@ class MainInput(Module):
 
 @dataclass
 class Input(Module):
-    _input_directions = set()  # type: ignore
+    _input_directions = _NO_DIRECTIONS
 
     input_id: int
 
     __hash__ = Module.__hash__
 
 
+# capacity of the cups provided by each level
+_CUP_CAPACITY = {
+    LevelId.WINE_OCLOCK: 2,
+    LevelId.THE_WALRUS: 5,
+    LevelId.CAFE_TRISTE: 4,
+    LevelId.HALF_CAFF_COFFEE: 4,
+    LevelId.BELLYS: 2,
+}
+
+
+def _get_entity_factory(level_id: LevelId, eid: EntityId) -> Callable[..., Entity]:
+    """Return a constructor for the entities spawned by an input in a level."""
+    if level_id is LevelId.SODA_TRENCH and eid is EntityId.CUP:
+        return functools.partial(PaintableCup, capacity=2)
+    if level_id is LevelId.MUMBAI_CHAAT and eid is EntityId.DOUGH:
+        return ChaatDough
+    if level_id is LevelId.CHAZ_CHEDDAR and eid is EntityId.DOUGH:
+        return PizzaDough
+    if eid is EntityId.CUP:
+        return functools.partial(Cup, capacity=_CUP_CAPACITY[level_id])
+    if eid is EntityId.NORI:
+        return Nori
+    if eid is EntityId.PLATE:
+        return SushiPlate
+    if level_id is LevelId.SUSHI_YEAH and eid is EntityId.BOWL:
+        return SushiBowl
+    return functools.partial(Entity, eid)
+
+
+@_register_module
 @dataclass
 class EntityInput(Input):
     _MODULE_IDS = [ModuleId.INPUT_1X, ModuleId.INPUT_2X, ModuleId.INPUT_3X]
@@ -366,48 +507,34 @@ class EntityInput(Input):
         self.entity_ids = level.entity_inputs[self.input_id]
         self.jacks = [InJack(eid.name) for eid in self.entity_ids]
         super().__post_init__(level)
+        self._entity_factories = [
+            _get_entity_factory(level.id, eid) for eid in self.entity_ids
+        ]
 
     def _str_parts(self) -> dict[str, str]:
         parts = super()._str_parts()
         parts["entity_ids"] = f"[{', '.join(eid.name for eid in self.entity_ids)}]"
         return parts
 
+    def wants_tick(self, state: State) -> bool:
+        del state
+        return self._has_input_signal()
+
     def tick(self, state: State) -> None:
-        input_count = sum(self._get_signals())
-        if input_count > 1:
-            raise TooManyActiveInputs(self)
-        if input_count == 0:
+        active = self.signal_values & self._input_mask
+        if not active:
             return
-        idx = self.signals.values.index(True)
-        eid = self.entity_ids[idx]
-        entity: Entity
-        if state.level.id is LevelId.SODA_TRENCH and eid is EntityId.CUP:
-            entity = PaintableCup(position=self.floor_position, capacity=2)
-        elif state.level.id is LevelId.MUMBAI_CHAAT and eid is EntityId.DOUGH:
-            entity = ChaatDough(position=self.floor_position)
-        elif state.level.id is LevelId.CHAZ_CHEDDAR and eid is EntityId.DOUGH:
-            entity = PizzaDough(position=self.floor_position)
-        elif eid is EntityId.CUP:
-            capacity = {
-                LevelId.WINE_OCLOCK: 2,
-                LevelId.THE_WALRUS: 5,
-                LevelId.CAFE_TRISTE: 4,
-                LevelId.HALF_CAFF_COFFEE: 4,
-                LevelId.BELLYS: 2,
-            }[state.level.id]
-            entity = Cup(position=self.floor_position, capacity=capacity)
-        elif eid is EntityId.NORI:
-            entity = Nori(position=self.floor_position)
-        elif eid is EntityId.PLATE:
-            entity = SushiPlate(position=self.floor_position)
-        elif state.level.id is LevelId.SUSHI_YEAH and eid is EntityId.BOWL:
-            entity = SushiBowl(position=self.floor_position)
-        else:
-            entity = Entity(id=eid, position=self.floor_position)
+        if active & (active - 1):
+            # more than one bit is set
+            raise TooManyActiveInputs(self)
+        entity = self._entity_factories[_lowest_bit_index(active)](
+            position=self.floor_position
+        )
         state.add_entity(entity)
         state.queue_move(entity, self.direction)
 
 
+@_register_module
 class Freezer(EntityInput):
     _MODULE_IDS = [
         ModuleId.FREEZER_1X,
@@ -434,27 +561,48 @@ class ToppingInput(Input):
         return parts
 
 
+@_register_module
 class FluidDispenser(ToppingInput):
     _MODULE_IDS = [
         ModuleId.FLUID_DISPENSER_1X,
         ModuleId.FLUID_DISPENSER_2X,
         ModuleId.FLUID_DISPENSER_3X,
     ]
+    # number of fluid operations each entity can hold, indexed by EntityId value
+    _FLUID_CAPACITY = _by_entity_value(
+        {
+            EntityId.NACHO: 2,  # 2twelve
+            EntityId.GLASS: 2,  # wine o'clock
+            EntityId.BOWL: 2,  # meat+3
+            EntityId.CONE: 4,  # mr chilly
+        },
+        0,
+    )
+
+    def __post_init__(self, level: Level) -> None:
+        super().__post_init__(level)
+        self._level_id = level.id
 
     def check(self) -> None:
         super().check()
-        spout_pos = self.floor_position.shift_by(self.direction)
+        spout_pos = self._front_position
         if not (0 <= spout_pos.row < 7 and 0 <= spout_pos.column < 6):
             raise InvalidSolutionError("Floor position out-of-bounds")
 
+    def wants_tick(self, state: State) -> bool:
+        del state
+        return self._has_input_signal()
+
     def tick(self, state: State) -> None:
         input_count = self._get_signal_count()
         if input_count > 1 and state.level.id is not LevelId.MR_CHILLY:
             raise TooManyActiveInputs(self)
         if input_count == 0:
             return
-        topping = self.topping_ids[self.signals.values.index(True)]
-        pos = self.floor_position.shift_by(self.direction)
+        topping = self.topping_ids[
+            _lowest_bit_index(self.signal_values & self._input_mask)
+        ]
+        pos = self._front_position
         target = state.get_entity(pos)
         if target is None:
             raise self.emergency_stop(
@@ -463,37 +611,59 @@ class FluidDispenser(ToppingInput):
         # can operate on top of tray
         if target.id is EntityId.TRAY and target.stack is not None:
             target = target.stack
-        error = self.emergency_stop(
-            "This liquid cannot be applied to this product.", pos
+        handlers = self._FLUID_HANDLERS
+        entity_cls = type(target)
+        handler = handlers.get(entity_cls)
+        if handler is None:
+            # use the handler for the closest base class, and remember it
+            handler = next(
+                handlers[cls] for cls in entity_cls.__mro__ if cls in handlers
+            )
+            handlers[entity_cls] = handler
+        handler(self, target, topping)
+
+    def _fluid_error(self) -> EmergencyStop:
+        return self.emergency_stop(
+            "This liquid cannot be applied to this product.", self._front_position
         )
+
+    def _add_fluid(self, target: Entity, topping: ToppingId) -> None:
+        cast(Cup, target).add_fluid(topping, self._fluid_error())
+
+    def _add_sauce(self, target: Entity, topping: ToppingId) -> None:
+        cast(ChaatDough, target).add_sauce(topping, self._fluid_error())
+
+    def _add_operation(self, target: Entity, topping: ToppingId) -> None:
         op = DispenseFluid(topping)
-        if isinstance(target, Cup):
-            target.add_fluid(topping, error)
-            return
-        if isinstance(target, ChaatDough):
-            target.add_sauce(topping, error)
-            return
-        if state.level.id is LevelId.MILDREDS_NOOK and target.id is EntityId.MULTITRAY:
+        if self._level_id is LevelId.MILDREDS_NOOK and target.id is EntityId.MULTITRAY:
             capacity = 1
-        elif target.id in (EntityId.NACHO, EntityId.GLASS, EntityId.BOWL):
-            capacity = 2
-        elif target.id is EntityId.CONE:
-            if input_count == 2:
-                op = DispenseFluidMixed(self.topping_ids[0], self.topping_ids[1])
-            capacity = 4
         else:
-            raise error
+            capacity = self._FLUID_CAPACITY[target.id.value]
+            if capacity == 0:
+                raise self._fluid_error()
+            if target.id is EntityId.CONE and self._get_signal_count() == 2:
+                op = DispenseFluidMixed(self.topping_ids[0], self.topping_ids[1])
         # check that any existing fluids match and we won't go over capacity
         if target.operations and (
             target.operations[-1] != op or len(target.operations) >= capacity
         ):
-            raise error
-        target.operations.append(op)
+            raise self._fluid_error()
+        target.add_operation(op)
+
+    # how to apply fluids to each entity class, looked up through the MRO
+    _FLUID_HANDLERS: ClassVar[
+        dict[type[Entity], Callable[[FluidDispenser, Entity, ToppingId], None]]
+    ] = {
+        Entity: _add_operation,
+        Cup: _add_fluid,
+        ChaatDough: _add_sauce,
+    }
 
 
+@_register_module
 class FluidCoater(ToppingInput):
     _MODULE_IDS = [ModuleId.FLUID_COATER]
-    _input_directions = {RelativeDirection.BACK}
+    _input_directions = _BACK_ONLY
     on_rack = False
 
     def __post_init__(self, level: Level) -> None:
@@ -502,12 +672,16 @@ class FluidCoater(ToppingInput):
         assert (
             len(self.topping_ids) == 1
         ), "invalid level: too many toppings for FluidCoater"
+        self._coat_op = CoatFluid(self.topping_ids[0])
+
+    def wants_tick(self, state: State) -> bool:
+        return self._has_entity(state)
 
     def tick(self, state: State) -> None:
-        target = state.get_entity(self.floor_position)
+        target = self._entity_here(state)
         if target is None:
             return
-        target.operations.append(CoatFluid(self.topping_ids[0]))
+        target.add_operation(self._coat_op)
         state.queue_move(target, self.direction)
 
     def handle_moves(
@@ -532,14 +706,15 @@ class FluidCoater(ToppingInput):
             EntityId.CHICKEN_LEG,
         ):
             raise error
-        if (
-            state.level.id in (LevelId.ROSIES_DOUGHNUTS, LevelId.DA_WINGS)
-            and target.operations != [Operation(OperationId.COOK_FRYER)] * 2
+        level_id = state.level.id
+        if level_id in (LevelId.ROSIES_DOUGHNUTS, LevelId.DA_WINGS) and not (
+            len(target.operations) == 2
+            and target.cook_count(OperationId.COOK_FRYER) == 2
         ):
             raise error
-        if state.level.id is LevelId.ON_THE_FRIED_SIDE and target.operations:
+        if level_id is LevelId.ON_THE_FRIED_SIDE and target.operations:
             raise error
-        if state.level.id is LevelId.DA_WINGS and target.id not in {
+        if level_id is LevelId.DA_WINGS and target.id not in {
             EntityId.CHICKEN_CUTLET,
             EntityId.CHICKEN_LEG,
         }:
@@ -547,23 +722,28 @@ class FluidCoater(ToppingInput):
         return move
 
 
+@_register_module
 class ToppingDispenser(ToppingInput):
     _MODULE_IDS = [ModuleId.TOPPING_DISPENSER]
-    _input_directions = {RelativeDirection.BACK}
+    _input_directions = _BACK_ONLY
+
+    def wants_tick(self, state: State) -> bool:
+        return self._has_input_signal() or self._has_entity(state)
 
     def tick(self, state: State) -> None:
-        target = state.get_entity(self.floor_position)
+        target = self._entity_here(state)
         if self._get_signal(0):
             if target is None:
                 raise self.emergency_stop("There is no product beneath this dispenser.")
-            target.operations.append(DispenseTopping(self.topping_ids[0]))
+            target.add_operation(DispenseTopping(self.topping_ids[0]))
         if target is not None:
             state.queue_move(target, self.direction)
 
 
+@_register_module
 class HalfToppingDispenser(ToppingInput):
     _MODULE_IDS = [ModuleId.HALF_TOPPING_DISPENSER]
-    _input_directions = {RelativeDirection.BACK}
+    _input_directions = _BACK_ONLY
 
     def check(self) -> None:
         super().check()
@@ -575,8 +755,11 @@ class HalfToppingDispenser(ToppingInput):
                 "Pizza topping dispenser can only face up or down"
             )
 
+    def wants_tick(self, state: State) -> bool:
+        return self._has_input_signal() or self._has_entity(state)
+
     def tick(self, state: State) -> None:
-        entity = state.get_entity(self.floor_position)
+        entity = self._entity_here(state)
         if self._get_signal(0):
             if entity is None:
                 raise self.emergency_stop("There is no product beneath this dispenser.")
@@ -584,7 +767,7 @@ class HalfToppingDispenser(ToppingInput):
             # can operate on top of tray
             if target.id is EntityId.TRAY and target.stack is not None:
                 target = target.stack
-            if not isinstance(target, PizzaDough):
+            if type(target) is not PizzaDough:
                 raise self.emergency_stop(
                     "This topping cannot be applied to this product."
                 )
@@ -593,14 +776,18 @@ class HalfToppingDispenser(ToppingInput):
             state.queue_move(entity, self.direction)
 
 
+@_register_module
 class Conveyor(Module):
     _MODULE_IDS = [ModuleId.CONVEYOR]
-    _input_directions = set(RelativeDirection)
+    _input_directions = _ALL_DIRECTIONS
     price = 5
     on_rack = False
 
+    def wants_tick(self, state: State) -> bool:
+        return self._has_entity(state)
+
     def tick(self, state: State) -> None:
-        target = state.get_entity(self.floor_position)
+        target = self._entity_here(state)
         if target is None:
             return
         state.queue_move(target, self.direction, force=False)
@@ -612,11 +799,12 @@ class Conveyor(Module):
         ignore_collisions: bool = False,
         dry_run: bool = False,
     ) -> Optional[MoveEntity]:
-        if not (state.get_entity(self.floor_position) is None or ignore_collisions):
+        if not (self._entity_here(state) is None or ignore_collisions):
             return None
         return super().handle_moves(state, moves, ignore_collisions, dry_run)
 
 
+@_register_module
 class Output(Module):
     _MODULE_IDS = [ModuleId.OUTPUT]
     on_rack = False
@@ -628,8 +816,11 @@ class Output(Module):
         if self.direction is not Direction.DOWN:
             raise InvalidSolutionError("Output must face down")
 
+    def wants_tick(self, state: State) -> bool:
+        return self._has_entity(state)
+
     def tick(self, state: State) -> None:
-        target = state.get_entity(self.floor_position)
+        target = self._entity_here(state)
         if target is None:
             return
         expected = state.level.order_products[state.order_index]
@@ -640,6 +831,7 @@ class Output(Module):
         state.queue_move(target, self.direction)
 
 
+@_register_module
 @dataclass
 class Router(Module):
     _MODULE_IDS = [ModuleId.ROUTER]
@@ -665,6 +857,9 @@ class Router(Module):
     def debug_str(self) -> str:
         return self.current_direction.relative_to(self.direction).name
 
+    def wants_tick(self, state: State) -> bool:
+        return self._has_input_signal() or self._has_entity(state)
+
     def tick(self, state: State) -> None:
         if self._get_signal_count() > 1:
             raise TooManyActiveInputs(self)
@@ -672,10 +867,10 @@ class Router(Module):
         if self._get_signal("THRU"):
             self.current_direction = self.direction
         elif self._get_signal("LEFT"):
-            self.current_direction = self.direction.left()
+            self.current_direction = self._left_direction
         elif self._get_signal("RIGHT"):
-            self.current_direction = self.direction.right()
-        target = state.get_entity(self.floor_position)
+            self.current_direction = self._right_direction
+        target = self._entity_here(state)
         if target is not None:
             state.queue_move(target, old_direction, force=False)
 
@@ -687,25 +882,30 @@ class Router(Module):
         dry_run: bool = False,
     ) -> Optional[MoveEntity]:
         # same as Conveyor.handle_moves()
-        if not (state.get_entity(self.floor_position) is None or ignore_collisions):
+        if not (self._entity_here(state) is None or ignore_collisions):
             return None
         return super().handle_moves(state, moves, ignore_collisions, dry_run)
 
 
+@_register_module
 class Sensor(Module):
     _MODULE_IDS = [ModuleId.SENSOR]
-    _input_directions = set()  # type: ignore
+    _input_directions = _NO_DIRECTIONS
     price = 5
     jacks = [OutJack("SENSE")]
 
     def update_signals(self, state: State) -> None:
-        target = state.get_entity(self.floor_position.shift_by(self.direction))
+        target = state.get_entity(self._front_position)
         self._set_signal("SENSE", target is not None, state)
 
 
 class EjectingModule(Module):
     """Common code shared between Sorter, Cooker, and Espresso."""
 
+    # whether ejection is triggered by an EJECT jack (otherwise, by any single
+    # active input)
+    _has_eject_jack = True
+
     def handle_moves(
         self,
         state: State,
@@ -717,53 +917,56 @@ class EjectingModule(Module):
         move = super().handle_moves(state, moves, ignore_collisions, dry_run)
         assert move is not None
 
-        available = state.get_entity(self.floor_position) is None or ignore_collisions
-        if not available:
-            if self.id is ModuleId.SORTER:
-                will_eject = self._get_signal_count() == 1
-            else:
-                # Cooker and Espresso
-                will_eject = self._get_signal("EJECT")
-            if will_eject:
-                # we're going to move the current entity away this tick, which should
-                # have been processed already
-                raise InternalSimulationError(
-                    "move evaluation order is incorrect", self.floor_position
-                )
-        if not available:
-            if move.force:
-                raise self.emergency_stop("These products have collided.", move.source)
-            return None
-        return move
+        if ignore_collisions or not self._has_entity(state):
+            return move
+        if self._has_eject_jack:
+            will_eject = self._get_signal("EJECT")
+        else:
+            will_eject = self._get_signal_count() == 1
+        if will_eject:
+            # we're going to move the current entity away this tick, which should
+            # have been processed already
+            raise InternalSimulationError(
+                "move evaluation order is incorrect", self.floor_position
+            )
+        if move.force:
+            raise self.emergency_stop("These products have collided.", move.source)
+        return None
 
 
+@_register_module
 class Sorter(EjectingModule):
     _MODULE_IDS = [ModuleId.SORTER]
-    _input_directions = set(RelativeDirection)
+    _has_eject_jack = False
+    _input_directions = _ALL_DIRECTIONS
     price = 10
     jacks = [OutJack("SENSE"), InJack("LEFT"), InJack("THRU"), InJack("RIGHT")]
 
+    def wants_tick(self, state: State) -> bool:
+        return self._has_input_signal() or self._has_entity(state)
+
     def tick(self, state: State) -> None:
         if self._get_signal_count() > 1:
             raise TooManyActiveInputs(self)
-        target = state.get_entity(self.floor_position)
+        target = self._entity_here(state)
         if target is None:
             return
         direction = None
         if self._get_signal("THRU"):
             direction = self.direction
         elif self._get_signal("LEFT"):
-            direction = self.direction.left()
+            direction = self._left_direction
         elif self._get_signal("RIGHT"):
-            direction = self.direction.right()
+            direction = self._right_direction
         if direction is not None:
             state.queue_move(target, direction)
 
     def update_signals(self, state: State) -> None:
-        target = state.get_entity(self.floor_position)
+        target = self._entity_here(state)
         self._set_signal("SENSE", target is not None, state)
 
 
+@_register_module
 @dataclass
 class Stacker(Module):
     _MODULE_IDS = [ModuleId.STACKER]
@@ -780,9 +983,12 @@ class Stacker(Module):
     def debug_str(self) -> str:
         return "just stacked" if self.just_stacked else ""
 
+    def wants_tick(self, state: State) -> bool:
+        return self.just_stacked or self._has_entity(state)
+
     def tick(self, state: State) -> None:
         self.just_stacked = False
-        target = state.get_entity(self.floor_position)
+        target = self._entity_here(state)
         if target is None or not self._get_signal("EJECT"):
             return
         state.queue_move(target, self.direction)
@@ -798,7 +1004,7 @@ class Stacker(Module):
         super().handle_moves(state, moves, ignore_collisions, dry_run)
         assert len(moves) == 1, "Stacker only handles one move"
         move = moves[0]
-        base = state.get_entity(self.floor_position)
+        base = self._entity_here(state)
         if base is None or ignore_collisions:
             return move
 
@@ -816,9 +1022,17 @@ class Stacker(Module):
             self._set_signal("STACK", True, state)
 
 
+_COOKER_OPERATION_FACTORIES = {
+    ModuleId.GRILL: CookGrill,
+    ModuleId.FRYER: CookFryer,
+    ModuleId.MICROWAVE: CookMicrowave,
+}
+
+
+@_register_module
 class Cooker(EjectingModule):
     _MODULE_IDS = [ModuleId.GRILL, ModuleId.FRYER, ModuleId.MICROWAVE]
-    _input_directions = {RelativeDirection.FRONT, RelativeDirection.BACK}
+    _input_directions = _FRONT_AND_BACK
     # maximum number of cook operations before an entity is burnt (over all levels)
     _MAX_COOK_TIMES = {
         EntityId.POCKET: 4,  # hot pocket
@@ -845,27 +1059,31 @@ class Cooker(EjectingModule):
         EntityId.POTATO: 4,  # belly's
         EntityId.ONION: 4,  # belly's
     }
+    # dense version of _MAX_COOK_TIMES, indexed by EntityId value (-1 if not cookable)
+    _MAX_COOK = _by_entity_value(_MAX_COOK_TIMES, -1)
     price = 20
     jacks = [OutJack("SENSE"), InJack("EJECT")]
 
+    def __post_init__(self, level: Level) -> None:
+        super().__post_init__(level)
+        self._cook_op = _COOKER_OPERATION_FACTORIES[self.id]()
+
+    def wants_tick(self, state: State) -> bool:
+        return self._has_entity(state)
+
     def tick(self, state: State) -> None:
-        target = state.get_entity(self.floor_position)
-        first_tick = not self.signals.values[0]
+        target = self._entity_here(state)
+        first_tick = not self.signal_values & 1
         if target is None:
             return
         if self._get_signal("EJECT"):
             state.queue_move(target, self.direction)
         elif not first_tick:
-            op = Operation(
-                {
-                    ModuleId.GRILL: OperationId.COOK_GRILL,
-                    ModuleId.FRYER: OperationId.COOK_FRYER,
-                    ModuleId.MICROWAVE: OperationId.COOK_MICROWAVE,
-                }[self.id]
-            )
+            op = self._cook_op
+            max_cook = self._MAX_COOK
             # don't cook things more after they're burnt
-            if target.operations.count(op) <= self._MAX_COOK_TIMES[target.id]:
-                target.operations.append(op)
+            if target.cook_count(op.id) <= max_cook[target.id.value]:
+                target.add_operation(op)
 
     def handle_moves(
         self,
@@ -881,7 +1099,7 @@ class Cooker(EjectingModule):
         error = self.emergency_stop(
             "This product cannot be heated by this machine.", move.source
         )
-        if target.id not in self._MAX_COOK_TIMES:
+        if self._MAX_COOK[target.id.value] < 0:
             raise error
         if (
             state.level.id is LevelId.ON_THE_FRIED_SIDE
@@ -891,15 +1109,38 @@ class Cooker(EjectingModule):
         return move
 
     def update_signals(self, state: State) -> None:
-        target = state.get_entity(self.floor_position)
+        target = self._entity_here(state)
         self._set_signal("SENSE", target is not None, state)
 
 
 class SimpleMachine(Module):
     on_rack = False
     price = 20
+    # message for the emergency stop raised when _accepts() rejects an entity
+    _reject_message = "This product cannot be processed."
+
+    def wants_tick(self, state: State) -> bool:
+        return self._has_entity(state)
+
+    def _accepts(self, state: State, target: Entity) -> bool:
+        """Return whether this machine can process an entity moving onto it."""
+        del state, target
+        return True
+
+    def handle_moves(
+        self,
+        state: State,
+        moves: list[MoveEntity],
+        ignore_collisions: bool = False,
+        dry_run: bool = False,
+    ) -> Optional[MoveEntity]:
+        move = super().handle_moves(state, moves)
+        if move is None or self._accepts(state, move.entity):
+            return move
+        raise self.emergency_stop(self._reject_message, move.source)
 
 
+@_register_module
 @dataclass
 class WasteBin(SimpleMachine):
     _MODULE_IDS = [ModuleId.WASTE_BIN]
@@ -915,7 +1156,7 @@ class WasteBin(SimpleMachine):
         return "full" if self.is_full else "empty"
 
     def tick(self, state: State) -> None:
-        target = state.get_entity(self.floor_position)
+        target = self._entity_here(state)
         if target is None:
             return
         if self.is_full:
@@ -924,8 +1165,10 @@ class WasteBin(SimpleMachine):
         state.remove_entity(target)
 
 
+@_register_module
 class DoubleSlicer(SimpleMachine):
     _MODULE_IDS = [ModuleId.DOUBLE_SLICER]
+    _reject_message = "This product cannot be sliced."
     _LOOKUP = {
         LevelId.CAFE_TRISTE: {
             EntityId.CIGARETTE_4X: EntityId.CIGARETTE_2X,
@@ -943,50 +1186,53 @@ class DoubleSlicer(SimpleMachine):
         },
     }
 
+    def __post_init__(self, level: Level) -> None:
+        super().__post_init__(level)
+        # what each entity gets sliced into in this level, indexed by EntityId value
+        self._slices: tuple[Optional[EntityId], ...] = _by_entity_value(
+            self._LOOKUP.get(level.id, {}), None
+        )
+        # whether both halves are new entities (otherwise, the left half is the
+        # original entity)
+        self._duplicate = level.id in (LevelId.CAFE_TRISTE, LevelId.SUSHI_YEAH)
+
     def tick(self, state: State) -> None:
-        target = state.get_entity(self.floor_position)
+        target = self._entity_here(state)
         if target is None:
             return
-        eid = self._LOOKUP[state.level.id][target.id]
-        if state.level.id in (LevelId.CAFE_TRISTE, LevelId.SUSHI_YEAH):
+        eid = self._slices[target.id.value]
+        assert eid is not None, "should have been caught in handle_moves()"
+        position = self.floor_position
+        if self._duplicate:
             state.remove_entity(target)
-            entity_r = Entity(eid, position=self.floor_position)
-            entity_l = Entity(eid, position=self.floor_position)
+            entity_r = Entity(eid, position=position)
+            entity_l = Entity(eid, position=position)
             state.add_entity(entity_r)
             state.add_entity(entity_l)
-        elif state.level.id is LevelId.SWEET_HEAT_BBQ:
-            entity_r = Entity(eid, position=self.floor_position)
+        else:
+            # sweet heat bbq
+            entity_r = Entity(eid, position=position)
             entity_l = target
             state.add_entity(entity_r)
-        state.queue_move(entity_r, direction=self.direction.right())
-        state.queue_move(entity_l, direction=self.direction.left())
+        state.queue_move(entity_r, direction=self._right_direction)
+        state.queue_move(entity_l, direction=self._left_direction)
 
-    def handle_moves(
-        self,
-        state: State,
-        moves: list[MoveEntity],
-        ignore_collisions: bool = False,
-        dry_run: bool = False,
-    ) -> Optional[MoveEntity]:
-        move = super().handle_moves(state, moves)
-        if move is None:
-            return None
-        target = move.entity
-        error = self.emergency_stop("This product cannot be sliced.", move.source)
-        if target.operations or target.stack:
-            raise error
-        if state.level.id not in self._LOOKUP:
-            raise error
-        if target.id not in self._LOOKUP[state.level.id]:
-            raise error
-        return move
+    def _accepts(self, state: State, target: Entity) -> bool:
+        del state
+        return (
+            not target.operations
+            and not target.stack
+            and self._slices[target.id.value] is not None
+        )
 
 
+@_register_module
 class TripleSlicer(SimpleMachine):
     _MODULE_IDS = [ModuleId.TRIPLE_SLICER]
+    _reject_message = "This product cannot be sliced."
 
     def tick(self, state: State) -> None:
-        target = state.get_entity(self.floor_position)
+        target = self._entity_here(state)
         if target is None:
             return
         assert target.id in (
@@ -994,8 +1240,9 @@ class TripleSlicer(SimpleMachine):
             EntityId.CHICKEN_HALF,
         ), "should have been caught in handle_moves()"
         state.remove_entity(target)
-        leg = Entity(EntityId.CHICKEN_LEG, position=self.floor_position)
-        cutlet = Entity(EntityId.CHICKEN_CUTLET, position=self.floor_position)
+        position = self.floor_position
+        leg = Entity(EntityId.CHICKEN_LEG, position=position)
+        cutlet = Entity(EntityId.CHICKEN_CUTLET, position=position)
         if state.level.id is LevelId.DA_WINGS and target.id is EntityId.CHICKEN_HALF:
             entity_r = cutlet
             entity_t = leg
@@ -1004,83 +1251,65 @@ class TripleSlicer(SimpleMachine):
             entity_t = cutlet
         state.add_entity(entity_r)
         state.add_entity(entity_t)
-        state.queue_move(entity_r, direction=self.direction.right())
+        state.queue_move(entity_r, direction=self._right_direction)
         state.queue_move(entity_t, direction=self.direction)
         if target.id == EntityId.CHICKEN:
-            entity_l = Entity(EntityId.CHICKEN_HALF, position=self.floor_position)
+            entity_l = Entity(EntityId.CHICKEN_HALF, position=position)
             state.add_entity(entity_l)
-            state.queue_move(entity_l, direction=self.direction.left())
+            state.queue_move(entity_l, direction=self._left_direction)
 
-    def handle_moves(
-        self,
-        state: State,
-        moves: list[MoveEntity],
-        ignore_collisions: bool = False,
-        dry_run: bool = False,
-    ) -> Optional[MoveEntity]:
-        move = super().handle_moves(state, moves)
-        if move is None:
-            return None
-        target = move.entity
-        error = self.emergency_stop("This product cannot be sliced.", move.source)
-        if target.id not in (EntityId.CHICKEN, EntityId.CHICKEN_HALF):
-            raise error
-        if target.operations or target.stack:
-            raise error
-        return move
+    def _accepts(self, state: State, target: Entity) -> bool:
+        del state
+        return (
+            target.id in (EntityId.CHICKEN, EntityId.CHICKEN_HALF)
+            and not target.operations
+            and not target.stack
+        )
 
 
+@_register_module
 class HorizontalSlicer(SimpleMachine):
     _MODULE_IDS = [ModuleId.HORIZONTAL_SLICER]
+    _reject_message = "This product cannot be sliced."
 
     def tick(self, state: State) -> None:
-        target = state.get_entity(self.floor_position)
+        target = self._entity_here(state)
         if target is None:
             return
         assert target.id is EntityId.BUN, "should have been caught in handle_moves()"
         state.remove_entity(target)
-        entity_r = Entity(EntityId.BUN_BOTTOM, position=self.floor_position)
-        entity_l = Entity(EntityId.BUN_TOP, position=self.floor_position)
+        position = self.floor_position
+        entity_r = Entity(EntityId.BUN_BOTTOM, position=position)
+        entity_l = Entity(EntityId.BUN_TOP, position=position)
         state.add_entity(entity_r)
         state.add_entity(entity_l)
-        state.queue_move(entity_r, direction=self.direction.right())
-        state.queue_move(entity_l, direction=self.direction.left())
+        state.queue_move(entity_r, direction=self._right_direction)
+        state.queue_move(entity_l, direction=self._left_direction)
 
-    def handle_moves(
-        self,
-        state: State,
-        moves: list[MoveEntity],
-        ignore_collisions: bool = False,
-        dry_run: bool = False,
-    ) -> Optional[MoveEntity]:
-        move = super().handle_moves(state, moves)
-        if move is None:
-            return None
-        target = move.entity
-        error = self.emergency_stop("This product cannot be sliced.", move.source)
-        if target.id is not EntityId.BUN:
-            raise error
-        if target.operations or target.stack:
-            raise error
-        return move
+    def _accepts(self, state: State, target: Entity) -> bool:
+        del state
+        return target.id is EntityId.BUN and not target.operations and not target.stack
 
 
+@_register_module
 class Roller(SimpleMachine):
     _MODULE_IDS = [ModuleId.ROLLER]
+    _reject_message = "This product cannot be rolled."
+    _ROLLABLE_PAPER_OPERATIONS = [DispenseTopping(ToppingId.LEAVES)]
 
     def tick(self, state: State) -> None:
-        target = state.get_entity(self.floor_position)
+        target = self._entity_here(state)
         if target is None:
             return
         if target.id is EntityId.PAPER:
-            assert target.operations == [
-                DispenseTopping(ToppingId.LEAVES)
-            ], "should have been caught in handle_moves()"
+            assert (
+                target.operations == self._ROLLABLE_PAPER_OPERATIONS
+            ), "should have been caught in handle_moves()"
             state.remove_entity(target)
             entity = Entity(EntityId.CIGARETTE_4X, position=self.floor_position)
             state.add_entity(entity)
             state.queue_move(entity, self.direction)
-        elif isinstance(target, Nori):
+        elif type(target) is Nori:
             if target.multistack[0].stack.id is EntityId.TUNA:  # type: ignore
                 roll_type = EntityId.TUNA_MAKI_4X
             else:
@@ -1092,121 +1321,87 @@ class Roller(SimpleMachine):
         else:
             assert False, "should have been caught in handle_moves()"
 
-    def handle_moves(
-        self,
-        state: State,
-        moves: list[MoveEntity],
-        ignore_collisions: bool = False,
-        dry_run: bool = False,
-    ) -> Optional[MoveEntity]:
-        move = super().handle_moves(state, moves)
-        if move is None:
-            return None
-        target = move.entity
-        error = self.emergency_stop("This product cannot be rolled.", move.source)
-        if target.id not in (EntityId.PAPER, EntityId.NORI):
-            raise error
-        if target.id is EntityId.PAPER and target.operations == [
-            DispenseTopping(ToppingId.LEAVES)
-        ]:
-            return move
-        if isinstance(target, Nori) and (
-            len(target.multistack) == 2
-            and target.multistack[0] == target.multistack[1]
-            and target.multistack[0]
-            in [
-                Entity(EntityId.RICE, stack=Entity(fish))
-                for fish in [EntityId.TUNA, EntityId.SALMON]
-            ]
-        ):
-            return move
-        raise error
+    def _accepts(self, state: State, target: Entity) -> bool:
+        del state
+        if target.id is EntityId.PAPER:
+            return target.operations == self._ROLLABLE_PAPER_OPERATIONS
+        if type(target) is not Nori or len(target.multistack) != 2:
+            return False
+        # both layers must be plain rice topped with plain tuna or salmon
+        layer, other_layer = target.multistack
+        fish = layer.stack
+        return (
+            layer.id is EntityId.RICE
+            and not layer.operations
+            and fish is not None
+            and fish.id in (EntityId.TUNA, EntityId.SALMON)
+            and not fish.operations
+            and fish.stack is None
+            and layer == other_layer
+        )
 
 
+@_register_module
 class Docker(SimpleMachine):
     _MODULE_IDS = [ModuleId.DOCKER]
+    _reject_message = "This product cannot be rolled."
 
     def tick(self, state: State) -> None:
-        target = state.get_entity(self.floor_position)
+        target = self._entity_here(state)
         if target is None:
             return
-        assert isinstance(
-            target, ChaatDough
-        ), "should have been caught in handle_moves()"
-        target.operations.append(Dock())
+        assert type(target) is ChaatDough, "should have been caught in handle_moves()"
+        target.add_operation(Dock())
         state.queue_move(target, self.direction)
 
-    def handle_moves(
-        self,
-        state: State,
-        moves: list[MoveEntity],
-        ignore_collisions: bool = False,
-        dry_run: bool = False,
-    ) -> Optional[MoveEntity]:
-        move = super().handle_moves(state, moves)
-        if move is None:
-            return None
-        target = move.entity
-        error = self.emergency_stop("This product cannot be rolled.", move.source)
-        if not isinstance(target, ChaatDough):
-            raise error
-        if target.operations or target.stack:
-            raise error
-        return move
+    def _accepts(self, state: State, target: Entity) -> bool:
+        del state
+        return type(target) is ChaatDough and not target.operations and not target.stack
 
 
+@_register_module
 class Flattener(SimpleMachine):
     _MODULE_IDS = [ModuleId.FLATTENER]
+    _reject_message = "This product cannot be rolled."
+    _FLATTENED_OPERATIONS = [Flatten()]
 
     def tick(self, state: State) -> None:
-        entity = state.get_entity(self.floor_position)
+        entity = self._entity_here(state)
         if entity is None:
             return
         target = entity
         # can operate on top of tray
         if target.id is EntityId.TRAY and target.stack is not None:
             target = target.stack
-        assert isinstance(
-            target, PizzaDough
-        ), "should have been caught in handle_moves()"
-        target.operations.append(Flatten())
+        assert type(target) is PizzaDough, "should have been caught in handle_moves()"
+        target.add_operation(Flatten())
         state.queue_move(entity, self.direction)
 
-    def handle_moves(
-        self,
-        state: State,
-        moves: list[MoveEntity],
-        ignore_collisions: bool = False,
-        dry_run: bool = False,
-    ) -> Optional[MoveEntity]:
-        move = super().handle_moves(state, moves)
-        if move is None:
-            return None
-        target = move.entity
+    def _accepts(self, state: State, target: Entity) -> bool:
+        del state
         # can operate on top of tray
         if target.id is EntityId.TRAY and target.stack is not None:
             target = target.stack
-        error = self.emergency_stop("This product cannot be rolled.", move.source)
-        if not isinstance(target, PizzaDough):
-            raise error
-        if target.operations and target.operations != [Flatten()]:
-            raise error
-        return move
+        return type(target) is PizzaDough and (
+            not target.operations or target.operations == self._FLATTENED_OPERATIONS
+        )
 
 
+@_register_module
 class Rotator(SimpleMachine):
     _MODULE_IDS = [ModuleId.ROTATOR]
-    _input_directions = {RelativeDirection.FRONT, RelativeDirection.BACK}
+    _reject_message = "This product cannot be rolled."
+    _input_directions = _FRONT_AND_BACK
 
     def tick(self, state: State) -> None:
-        entity = state.get_entity(self.floor_position)
+        entity = self._entity_here(state)
         if entity is None:
             return
         target = entity
         # can operate on top of tray
         if target.id is EntityId.TRAY and target.stack is not None:
             target = target.stack
-        if isinstance(target, PizzaDough):
+        if type(target) is PizzaDough:
             # swap left and right toppings
             target.left_toppings, target.right_toppings = (
                 target.right_toppings,
@@ -1214,59 +1409,54 @@ class Rotator(SimpleMachine):
             )
         state.queue_move(entity, self.direction)
 
-    def handle_moves(
-        self,
-        state: State,
-        moves: list[MoveEntity],
-        ignore_collisions: bool = False,
-        dry_run: bool = False,
-    ) -> Optional[MoveEntity]:
-        move = super().handle_moves(state, moves)
-        if move is None:
-            return None
-        target = move.entity
+    def _accepts(self, state: State, target: Entity) -> bool:
+        del state
         # can operate on top of tray
         if target.id is EntityId.TRAY and target.stack is not None:
             target = target.stack
-        error = self.emergency_stop("This product cannot be rolled.", move.source)
-        if not (isinstance(target, PizzaDough) or target.id is EntityId.TRAY):
-            raise error
-        return move
+        return type(target) is PizzaDough or target.id is EntityId.TRAY
 
 
+@_register_module
 @dataclass
 class Painter(Module):
     _MODULE_IDS = [ModuleId.PAINTER]
-    _input_directions = {RelativeDirection.FRONT, RelativeDirection.BACK}
+    _input_directions = _FRONT_AND_BACK
     price = 40
+    # bits of PaintableCup.colors that each mask paints over
+    _MASK_BITS = {
+        PaintMask.UPPER_2: 0x00FFFF,
+        PaintMask.UPPER_1: 0x0000FF,
+        PaintMask.LOWER_1: 0xFF0000,
+        PaintMask.LOWER_2: 0xFFFF00,
+    }
 
     color: PaintColor
     mask: PaintMask
 
     __hash__ = Module.__hash__
 
+    def __post_init__(self, level: Level) -> None:
+        super().__post_init__(level)
+        # paint colors go from top to bottom, with the top in the lowest byte
+        self._set_bits = self._MASK_BITS[self.mask]
+        self._color_bits = (self.color.value * 0x010101) & self._set_bits
+
     def _str_parts(self) -> dict[str, str]:
         parts = super()._str_parts()
         parts["color"] = self.color.name
         parts["mask"] = self.mask.name
         return parts
 
+    def wants_tick(self, state: State) -> bool:
+        return self._has_entity(state)
+
     def tick(self, state: State) -> None:
-        target = state.get_entity(self.floor_position)
+        target = self._entity_here(state)
         if target is None:
             return
-        assert isinstance(
-            target, PaintableCup
-        ), "should have been caught in handle_moves()"
-        # paint colors go from top to bottom
-        indices = {
-            PaintMask.UPPER_2: [0, 1],
-            PaintMask.UPPER_1: [0],
-            PaintMask.LOWER_1: [2],
-            PaintMask.LOWER_2: [1, 2],
-        }[self.mask]
-        for i in indices:
-            target.colors[i] = self.color
+        assert type(target) is PaintableCup, "should have been caught in handle_moves()"
+        target.colors = (target.colors & ~self._set_bits) | self._color_bits
         state.queue_move(target, self.direction)
 
     def handle_moves(
@@ -1281,17 +1471,19 @@ class Painter(Module):
             return None
         target = move.entity
         error = self.emergency_stop("This product cannot be painted.", move.source)
-        if not isinstance(target, PaintableCup):
+        if type(target) is not PaintableCup:
             raise error
         return move
 
 
+@_register_module
 @dataclass
 class Espresso(EjectingModule):
     _MODULE_IDS = [ModuleId.ESPRESSO]
-    _input_directions = {RelativeDirection.FRONT, RelativeDirection.BACK}
+    _input_directions = _FRONT_AND_BACK
     price = 40
     jacks = [InJack(name) for name in ["GRIND", "XTRACT", "STEAM", "EJECT"]]
+    _STEAMABLE_FLUIDS = frozenset({ToppingId.MILK, ToppingId.FOAM})
 
     grind_count: int = 0
 
@@ -1311,16 +1503,21 @@ class Espresso(EjectingModule):
     def debug_str(self) -> str:
         return f"grind_count={self.grind_count}"
 
+    def wants_tick(self, state: State) -> bool:
+        del state
+        return self._has_input_signal()
+
     def tick(self, state: State) -> None:
-        if self._get_signal_count() > 1:
+        grind, xtract, steam, eject = self._get_signals()
+        if grind + xtract + steam + eject > 1:
             raise TooManyActiveInputs(self)
-        if self._get_signal("GRIND"):
+        if grind:
             if self.grind_count >= 4:
                 raise self.emergency_stop("The espresso filter is already full.")
             self.grind_count += 1
             return
-        target = state.get_entity(self.floor_position)
-        if self._get_signal("EJECT"):
+        target = self._entity_here(state)
+        if eject:
             if target is not None:
                 state.queue_move(target, self.direction)
             return
@@ -1330,7 +1527,7 @@ class Espresso(EjectingModule):
             and target.stack is not None
         ):
             target = target.stack
-        if self._get_signal("XTRACT"):
+        if xtract:
             error = self.emergency_stop("Extraction requires a proper target product.")
             if not isinstance(target, Cup):
                 raise error
@@ -1339,21 +1536,25 @@ class Espresso(EjectingModule):
             self.grind_count = 0
             target.add_fluid(ToppingId.COFFEE, error)
             return
-        if self._get_signal("STEAM"):
+        if steam:
             error = self.emergency_stop("Steaming requires a proper target product.")
             if not isinstance(target, Cup):
                 raise error
             # milk can be foamed as long as there's only milk and foam in the cup
-            if not (+target.contents).keys() <= {ToppingId.MILK, ToppingId.FOAM}:
+            if any(
+                count > 0 and fluid not in self._STEAMABLE_FLUIDS
+                for fluid, count in target.contents.items()
+            ):
                 raise error
             target.remove_fluid(ToppingId.MILK)
             target.add_fluid(ToppingId.FOAM, error)
 
 
+@_register_module
 @dataclass
 class Animatronic(Module):
     _MODULE_IDS = [ModuleId.ANIMATRONIC]
-    _input_directions = set()  # type: ignore
+    _input_directions = _NO_DIRECTIONS
     rack_width = 2
     price = 40
     jacks = [
@@ -1370,6 +1571,7 @@ class Animatronic(Module):
         return parts
 
 
+@_register_module
 class Multimixer(Module):
     _MODULE_IDS = [ModuleId.MULTIMIXER]
     on_floor = False
@@ -1378,17 +1580,20 @@ class Multimixer(Module):
         *[InJack(f"IN_{i+1}") for i in range(4)],
         *[OutJack(f"OUT_{i+1}") for i in range(4)],
     ]
+    _ALL_OUTPUTS_ON = (True,) * 4
+    _OUTPUT_MASK = 0b1111_0000
 
     def _set_input_signal(
-        self, idx: int, value: bool, state: State, seen: set[tuple[Module, int]]
+        self, idx: int, value: bool, state: State, seen: bytearray
     ) -> None:
         super()._set_input_signal(idx, value, state, seen)
-        # propagate to all connected outputs
-        value = any(self.signals.next_values[:4])
-        if value:
-            self._set_signals([value] * 4, state, seen)
+        # propagate to all connected outputs, unless they're already on
+        next_values = self.next_signal_values
+        if next_values & 0b1111 and ~next_values & self._OUTPUT_MASK:
+            self._set_signals(self._ALL_OUTPUTS_ON, state, seen)
 
 
+@_register_module
 class MultimixerEnable(Module):
     _MODULE_IDS = [ModuleId.MULTIMIXER_ENABLE]
     on_floor = False
@@ -1398,17 +1603,24 @@ class MultimixerEnable(Module):
         *[InJack(f"IN_{i+1}") for i in range(3)],
         *[OutJack(f"OUT_{i+1}") for i in range(3)],
     ]
+    _ALL_OUTPUTS_ON = (True,) * 3
+    _OUTPUT_MASK = 0b111_0000
 
     def _set_input_signal(
-        self, idx: int, value: bool, state: State, seen: set[tuple[Module, int]]
+        self, idx: int, value: bool, state: State, seen: bytearray
     ) -> None:
         super()._set_input_signal(idx, value, state, seen)
-        # propagate to all connected outputs
-        value = self.signals.next_values[0] and any(self.signals.next_values[1:4])
-        if value:
-            self._set_signals([value] * 3, state, seen)
+        # propagate to all connected outputs, unless they're already on
+        next_values = self.next_signal_values
+        if (
+            next_values & 0b0001
+            and next_values & 0b1110
+            and ~next_values & self._OUTPUT_MASK
+        ):
+            self._set_signals(self._ALL_OUTPUTS_ON, state, seen)
 
 
+@_register_module
 @dataclass
 class SmallCounter(Module):
     _MODULE_IDS = [ModuleId.SMALL_COUNTER]
@@ -1416,11 +1628,16 @@ class SmallCounter(Module):
     price = 3
     jacks = [OutJack("ZERO"), InJack("IN_1"), InJack("IN_2")]
 
-    values: list[int]
+    values: tuple[int, ...]
     count: int = 0
 
     __hash__ = Module.__hash__
 
+    def __post_init__(self, level: Level) -> None:
+        super().__post_init__(level)
+        # the increments never change, so store them immutably
+        self.values = tuple(self.values)
+
     def _str_parts(self) -> dict[str, str]:
         parts = super()._str_parts()
         parts["values"] = repr(self.values)
@@ -1440,16 +1657,26 @@ class SmallCounter(Module):
     def debug_str(self) -> str:
         return f"count={self.count}"
 
+    def wants_tick(self, state: State) -> bool:
+        del state
+        return self._has_input_signal()
+
     def tick(self, state: State) -> None:
-        for signal, increment in zip(self._get_signals(), self.values):
-            if signal:
-                self.count = self.count + increment
-        self.count = max(-99, min(self.count, 99))
+        signals = self.signal_values & self._input_mask
+        if not signals:
+            return
+        count = self.count
+        for idx, increment in zip(self._input_indices, self.values):
+            if (signals >> idx) & 1:
+                count += increment
+        if count != self.count:
+            self.count = -99 if count < -99 else 99 if count > 99 else count
 
     def update_signals(self, state: State) -> None:
         self._set_signal("ZERO", self.count == 0, state)
 
 
+@_register_module
 @dataclass
 class BigCounter(Module):
     _MODULE_IDS = [ModuleId.BIG_COUNTER]
@@ -1464,11 +1691,16 @@ class BigCounter(Module):
         InJack("IN_4"),
     ]
 
-    values: list[int]
+    values: tuple[int, ...]
     count: int = 0
 
     __hash__ = Module.__hash__
 
+    def __post_init__(self, level: Level) -> None:
+        super().__post_init__(level)
+        # the increments never change, so store them immutably
+        self.values = tuple(self.values)
+
     def _str_parts(self) -> dict[str, str]:
         parts = super()._str_parts()
         parts["values"] = repr(self.values)
@@ -1488,17 +1720,27 @@ class BigCounter(Module):
     def debug_str(self) -> str:
         return f"count={self.count}"
 
+    def wants_tick(self, state: State) -> bool:
+        del state
+        return self._has_input_signal()
+
     def tick(self, state: State) -> None:
-        for signal, increment in zip(self._get_signals(), self.values):
-            if signal:
-                self.count = self.count + increment
-        self.count = max(-99, min(self.count, 99))
+        signals = self.signal_values & self._input_mask
+        if not signals:
+            return
+        count = self.count
+        for idx, increment in zip(self._input_indices, self.values):
+            if (signals >> idx) & 1:
+                count += increment
+        if count != self.count:
+            self.count = -99 if count < -99 else 99 if count > 99 else count
 
     def update_signals(self, state: State) -> None:
         self._set_signal("ZERO", self.count == 0, state)
         self._set_signal("POS", self.count > 0, state)
 
 
+@_register_module
 @dataclass
 class Sequencer(Module):
     _MODULE_IDS = [ModuleId.SEQUENCER]
@@ -1513,12 +1755,23 @@ class Sequencer(Module):
         OutJack("C"),
         OutJack("D"),
     ]
+    _START_BIT = 1 << 0
+    _STOP_BIT = 1 << 1
 
-    rows: list[list[bool]]
+    rows: tuple[tuple[bool, ...], ...]
     current_row: int = -1
 
     __hash__ = Module.__hash__
 
+    def __post_init__(self, level: Level) -> None:
+        super().__post_init__(level)
+        self.rows = tuple(map(tuple, self.rows))
+        # the output jacks turned on by each row
+        self._row_outputs = tuple(
+            tuple(idx for idx, on in zip(self._output_indices, row) if on)
+            for row in self.rows
+        )
+
     def _str_parts(self) -> dict[str, str]:
         parts = super()._str_parts()
         pretty = {
@@ -1540,44 +1793,51 @@ class Sequencer(Module):
     def debug_str(self) -> str:
         return f"row={self.current_row}"
 
+    def wants_tick(self, state: State) -> bool:
+        del state
+        return self.current_row != -1 or self._has_input_signal()
+
     def tick(self, state: State) -> None:
+        signals = self.signal_values
+        if self.current_row == -1:
+            # idle: only START matters
+            if signals & self._START_BIT:
+                self.current_row = 0
+            return
         if 0 <= self.current_row < 12:
             self.current_row += 1
-        if self.current_row == 12 or self._get_signal("STOP"):
+        if self.current_row == 12 or signals & self._STOP_BIT:
             self.current_row = -1
-        if self.current_row == -1 and self._get_signal("START"):
-            self.current_row = 0
+            if signals & self._START_BIT:
+                self.current_row = 0
 
     def update_signals(self, state: State) -> None:
         if 0 <= self.current_row < 12:
-            self._set_signals(self.rows[self.current_row], state)
+            # outputs are already off at this point, so only set the ones that
+            # turn on
+            outputs = self._row_outputs[self.current_row]
+            seen = None
+            for idx in outputs:
+                seen = self._set_signal(idx, True, state, seen)
 
 
+@functools.cache
 def populate_module_table() -> dict[ModuleId, Type[Module]]:
-    lookup: dict[ModuleId, Type[Module]] = {}
-    # dynamically pick up all Module subclasses in this module
-    for value in globals().values():
-        if (
-            isinstance(value, type)
-            and issubclass(value, Module)
-            and hasattr(value, "_MODULE_IDS")
-        ):
-            # pylint: disable-next=protected-access
-            for module_id in value._MODULE_IDS:  # type: ignore  # dynamically checked
-                assert isinstance(module_id, ModuleId), f"bad _MODULE_IDS for {value}"
-                assert (
-                    module_id not in lookup
-                ), f"{module_id} is claimed by {lookup[module_id]} and {value}"
-                lookup[module_id] = value
-
+    # all the Module subclasses register themselves with @_register_module, so
+    # just check that every module id is handled
     valid_ids = set(ModuleId) - {
         ModuleId.MAIN_INPUT_BASE,
         ModuleId.SCANNER_BASE,
     }
     assert (
-        lookup.keys() == valid_ids
-    ), f"unhandled module ids: {valid_ids - lookup.keys()}"
-    return lookup
+        _MODULE_REGISTRY.keys() == valid_ids
+    ), f"unhandled module ids: {valid_ids - _MODULE_REGISTRY.keys()}"
+    return _MODULE_REGISTRY
+
 
+def get_module_lookup() -> dict[ModuleId, Type[Module]]:
+    """Return the mapping from module ids to Module subclasses.
 
-MODULE_LOOKUP = populate_module_table()
+    The table is checked for completeness on first use, rather than at import time.
+    """
+    return populate_module_table()
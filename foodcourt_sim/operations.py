@@ -25,47 +25,79 @@ def _id_to_name(op_id: OperationId) -> str:
     return "".join(map(str.title, op_id.name.split("_")))
 
 
-@functools.total_ordering  # optimization note: this adds some overhead (see the docs)
 @dataclass(frozen=True, repr=False)
 class Operation:
     id: OperationId
+    _compare_key: tuple[Any, ...] = dataclasses.field(
+        init=False, repr=False, compare=False
+    )
+
+    def __post_init__(self) -> None:
+        # operations are immutable, so the ordering key only needs to be built once
+        fields = dataclasses.fields(self)
+        key = tuple(getattr(self, f.name) for f in fields if f.compare)
+        object.__setattr__(self, "_compare_key", key)
 
     def __repr__(self) -> str:
         field_descs = [
             f"{getattr(self, f.name)!r}"
             for f in dataclasses.fields(self)
-            if f.name != "id"
+            if f.repr and f.name != "id"
         ]
         return f"{_id_to_name(self.id)}({', '.join(field_descs)})"
 
-    def _compare_key(self) -> tuple[Any, ...]:
-        return tuple(getattr(self, f.name) for f in dataclasses.fields(self))
+    # the comparisons are written out rather than using functools.total_ordering,
+    # which adds an extra call to every derived comparison
 
     def __lt__(self, other: Any) -> bool:
         if not isinstance(other, Operation):
             return NotImplemented
-        return self._compare_key() < other._compare_key()
+        return self._compare_key < other._compare_key
+
+    def __le__(self, other: Any) -> bool:
+        if not isinstance(other, Operation):
+            return NotImplemented
+        return self._compare_key <= other._compare_key
+
+    def __gt__(self, other: Any) -> bool:
+        if not isinstance(other, Operation):
+            return NotImplemented
+        return self._compare_key > other._compare_key
+
+    def __ge__(self, other: Any) -> bool:
+        if not isinstance(other, Operation):
+            return NotImplemented
+        return self._compare_key >= other._compare_key
 
     def dump(self) -> tuple[Any, ...]:
         return (self.id,)
 
 
+# operations are immutable, so the factory functions are cached to return shared
+# instances
+
+
+@functools.cache
 def CookFryer() -> Operation:
     return Operation(OperationId.COOK_FRYER)
 
 
+@functools.cache
 def CookMicrowave() -> Operation:
     return Operation(OperationId.COOK_MICROWAVE)
 
 
+@functools.cache
 def CookGrill() -> Operation:
     return Operation(OperationId.COOK_GRILL)
 
 
+@functools.cache
 def Dock() -> Operation:
     return Operation(OperationId.DOCK)
 
 
+@functools.cache
 def Flatten() -> Operation:
     return Operation(OperationId.FLATTEN)
 
@@ -78,6 +110,7 @@ class Dispense(Operation):
         return (self.id, self.topping)
 
 
+@functools.cache
 def DispenseFluid(topping: ToppingId) -> Operation:
     return Dispense(OperationId.DISPENSE_FLUID, topping)
 
@@ -86,7 +119,8 @@ def DispenseFluid(topping: ToppingId) -> Operation:
 class _DispenseFluidMixed(Dispense):
     topping_2: ToppingId
 
-    def __post_init__(self):
+    def __post_init__(self) -> None:
+        super().__post_init__()
         assert self.topping != self.topping_2, "duplicate mixed fluid"
         assert self.topping < self.topping_2, "mixed fluids are out of order"
 
@@ -94,6 +128,7 @@ class _DispenseFluidMixed(Dispense):
         return (self.id, self.topping, self.topping_2)
 
 
+@functools.cache
 def DispenseFluidMixed(topping_1: ToppingId, topping_2: ToppingId) -> Operation:
     if topping_1 > topping_2:
         # swap the toppings so the lower one is first
@@ -101,9 +136,11 @@ def DispenseFluidMixed(topping_1: ToppingId, topping_2: ToppingId) -> Operation:
     return _DispenseFluidMixed(OperationId.DISPENSE_FLUID_MIXED, topping_1, topping_2)
 
 
+@functools.cache
 def CoatFluid(topping_id: ToppingId) -> Operation:
     return Dispense(OperationId.COAT_FLUID, topping_id)
 
 
+@functools.cache
 def DispenseTopping(topping_id: ToppingId) -> Operation:
     return Dispense(OperationId.DISPENSE_TOPPING, topping_id)
@@ -1,16 +1,16 @@
 #!/usr/bin/env python3
 import contextlib
 import io
+import itertools
 import struct
 from pathlib import Path
-from typing import Any, BinaryIO, Generator, Optional, Union, cast
+from typing import Any, BinaryIO, Callable, Generator, Optional, Union, cast
 
 from .enums import LevelId, ModuleId, MusicMode, PaintColor, PaintMask
 from .errors import InvalidSolutionError
 from .levels import BY_ID, Level
 from .models import Direction, Position
 from .modules import (
-    MODULE_LOOKUP,
     Animatronic,
     BigCounter,
     Input,
@@ -18,11 +18,28 @@ from .modules import (
     Painter,
     Sequencer,
     SmallCounter,
+    get_module_lookup,
 )
 from .solution import Solution, Wire
 
 __all__ = ["read_solution", "read_solutions", "write_solution", "dump_solution"]
 
+# precompiled layouts for the fixed-size records (all little-endian)
+# signed integers, by size in bytes
+_INTS = {1: struct.Struct("<b"), 2: struct.Struct("<h"), 4: struct.Struct("<i")}
+_POSITION = struct.Struct("<2i")
+# module id, can_delete, rack position, floor position
+_MODULE_HEADER = struct.Struct("<iB4i")
+_WIRE = struct.Struct("<4i")
+_SMALL_COUNTER_VALUES = struct.Struct("<2i")
+_BIG_COUNTER_VALUES = struct.Struct("<4i")
+# 12 rows of 4 outputs each
+_SEQUENCER_ROWS = struct.Struct("<48?")
+_PAINTER_SETTINGS = struct.Struct("<2i")
+
+_ExtrasReader = Callable[[BinaryIO], dict[str, Any]]
+_ExtrasWriter = Callable[[BinaryIO, Any], None]
+
 
 def read_bytes(stream: BinaryIO, size: int) -> bytes:
     b = stream.read(size)
@@ -38,11 +55,11 @@ def write_bytes(stream: BinaryIO, b: bytes) -> None:
 
 
 def read_int(stream: BinaryIO, size: int) -> int:
-    return int.from_bytes(read_bytes(stream, size), byteorder="little", signed=True)
+    return _INTS[size].unpack(read_bytes(stream, size))[0]
 
 
 def write_int(stream: BinaryIO, value: int, size: int) -> None:
-    stream.write(value.to_bytes(size, byteorder="little", signed=True))
+    write_bytes(stream, _INTS[size].pack(value))
 
 
 def read_bool(stream: BinaryIO) -> bool:
@@ -66,38 +83,113 @@ def write_string(stream: BinaryIO, s: str) -> None:
 
 
 def read_position(stream: BinaryIO) -> Position:
-    column = read_int(stream, 4)
-    row = read_int(stream, 4)
+    column, row = _POSITION.unpack(read_bytes(stream, _POSITION.size))
     return Position(column, row)
 
 
 def write_position(stream: BinaryIO, pos: Position) -> None:
-    write_int(stream, pos.column, 4)
-    write_int(stream, pos.row, 4)
+    write_bytes(stream, _POSITION.pack(pos.column, pos.row))
+
+
+def _read_input_extras(stream: BinaryIO) -> dict[str, Any]:
+    return {"input_id": read_int(stream, 4)}
+
+
+def _write_input_extras(stream: BinaryIO, module: Input) -> None:
+    write_int(stream, module.input_id, 4)
+
+
+def _read_small_counter_extras(stream: BinaryIO) -> dict[str, Any]:
+    data = read_bytes(stream, _SMALL_COUNTER_VALUES.size)
+    return {"values": _SMALL_COUNTER_VALUES.unpack(data)}
+
+
+def _write_small_counter_extras(stream: BinaryIO, module: SmallCounter) -> None:
+    write_bytes(stream, _SMALL_COUNTER_VALUES.pack(*module.values))
+
+
+def _read_big_counter_extras(stream: BinaryIO) -> dict[str, Any]:
+    data = read_bytes(stream, _BIG_COUNTER_VALUES.size)
+    return {"values": _BIG_COUNTER_VALUES.unpack(data)}
+
+
+def _write_big_counter_extras(stream: BinaryIO, module: BigCounter) -> None:
+    write_bytes(stream, _BIG_COUNTER_VALUES.pack(*module.values))
+
+
+def _read_sequencer_extras(stream: BinaryIO) -> dict[str, Any]:
+    cells = _SEQUENCER_ROWS.unpack(read_bytes(stream, _SEQUENCER_ROWS.size))
+    return {"rows": tuple(cells[i : i + 4] for i in range(0, len(cells), 4))}
+
+
+def _write_sequencer_extras(stream: BinaryIO, module: Sequencer) -> None:
+    cells = itertools.chain.from_iterable(module.rows)
+    write_bytes(stream, _SEQUENCER_ROWS.pack(*cells))
+
+
+def _read_painter_extras(stream: BinaryIO) -> dict[str, Any]:
+    color, mask = _PAINTER_SETTINGS.unpack(read_bytes(stream, _PAINTER_SETTINGS.size))
+    return {"color": PaintColor(color), "mask": PaintMask(mask)}
+
+
+def _write_painter_extras(stream: BinaryIO, module: Painter) -> None:
+    write_bytes(stream, _PAINTER_SETTINGS.pack(module.color.value, module.mask.value))
+
+
+def _read_animatronic_extras(stream: BinaryIO) -> dict[str, Any]:
+    return {"music_mode": MusicMode(read_int(stream, 1))}
+
+
+def _write_animatronic_extras(stream: BinaryIO, module: Animatronic) -> None:
+    write_int(stream, module.music_mode.value, 1)
+
+
+# readers and writers for the module-specific fields, checked in order
+_EXTRAS_HANDLERS: list[tuple[type[Module], _ExtrasReader, _ExtrasWriter]] = [
+    (Input, _read_input_extras, _write_input_extras),
+    (SmallCounter, _read_small_counter_extras, _write_small_counter_extras),
+    (BigCounter, _read_big_counter_extras, _write_big_counter_extras),
+    (Sequencer, _read_sequencer_extras, _write_sequencer_extras),
+    (Painter, _read_painter_extras, _write_painter_extras),
+    (Animatronic, _read_animatronic_extras, _write_animatronic_extras),
+]
+
+
+_extras_handler_cache: dict[
+    type[Module], Optional[tuple[_ExtrasReader, _ExtrasWriter]]
+] = {}
+
+
+def _get_extras_handlers(
+    cls: type[Module],
+) -> Optional[tuple[_ExtrasReader, _ExtrasWriter]]:
+    """Find the extra field handlers for a module class (or None if it has none).
+
+    Cached per class, so the subclass checks only run once.
+    """
+    if cls in _extras_handler_cache:
+        return _extras_handler_cache[cls]
+    handlers: Optional[tuple[_ExtrasReader, _ExtrasWriter]] = None
+    for base, reader, writer in _EXTRAS_HANDLERS:
+        if issubclass(cls, base):
+            handlers = reader, writer
+            break
+    _extras_handler_cache[cls] = handlers
+    return handlers
 
 
 def read_module(stream: BinaryIO, level: Level) -> Module:
-    module_id = ModuleId(read_int(stream, 4))
-    cls = MODULE_LOOKUP[module_id]
-    can_delete = read_bool(stream)
-    rack_pos = read_position(stream)
-    floor_pos = read_position(stream)
-    # pylint: disable-next=protected-access
-    extras: dict[str, Any] = {}
-    if issubclass(cls, Input):
-        extras["input_id"] = read_int(stream, 4)
-    elif issubclass(cls, SmallCounter):
-        extras["values"] = [read_int(stream, 4) for _ in range(2)]
-    elif issubclass(cls, BigCounter):
-        extras["values"] = [read_int(stream, 4) for _ in range(4)]
-    elif issubclass(cls, Sequencer):
-        data = read_bytes(stream, 4 * 12)
-        extras["rows"] = list(map(list, struct.iter_unpack("4?", data)))
-    elif issubclass(cls, Painter):
-        extras["color"] = PaintColor(read_int(stream, 4))
-        extras["mask"] = PaintMask(read_int(stream, 4))
-    elif issubclass(cls, Animatronic):
-        extras["music_mode"] = MusicMode(read_int(stream, 1))
+    raw_id, raw_can_delete, *coords = _MODULE_HEADER.unpack(
+        read_bytes(stream, _MODULE_HEADER.size)
+    )
+    module_id = ModuleId(raw_id)
+    assert raw_can_delete in [0, 1], f"invalid bool value {raw_can_delete:#x}"
+    can_delete = raw_can_delete == 1
+    cls = get_module_lookup()[module_id]
+    rack_pos = Position(coords[0], coords[1])
+    floor_pos = Position(coords[2], coords[3])
+    handlers = _get_extras_handlers(cls)
+    extras = handlers[0](stream) if handlers is not None else {}
 
     direction = Direction(read_int(stream, 1))
 
@@ -105,39 +197,27 @@ def read_module(stream: BinaryIO, level: Level) -> Module:
 
 
 def write_module(stream: BinaryIO, module: Module) -> None:
-    write_int(stream, module.id.value, 4)
-    write_bool(stream, module.can_delete)
-    write_position(stream, module.rack_position)
-    write_position(stream, module.floor_position)
-    if isinstance(module, Input):
-        write_int(stream, module.input_id, 4)
-    elif isinstance(module, (SmallCounter, BigCounter)):
-        for val in module.values:
-            write_int(stream, val, 4)
-    elif isinstance(module, Sequencer):
-        for row in module.rows:
-            write_bytes(stream, struct.pack("4?", *row))
-    elif isinstance(module, Painter):
-        write_int(stream, module.color.value, 4)
-        write_int(stream, module.mask.value, 4)
-    elif isinstance(module, Animatronic):
-        write_int(stream, module.music_mode.value, 1)
+    write_bytes(
+        stream,
+        _MODULE_HEADER.pack(
+            module.id.value,
+            module.can_delete,
+            *module.rack_position,
+            *module.floor_position,
+        ),
+    )
+    handlers = _get_extras_handlers(type(module))
+    if handlers is not None:
+        handlers[1](stream, module)
     write_int(stream, module.direction.value, 1)
 
 
 def read_wire(stream: BinaryIO) -> Wire:
-    module_1 = read_int(stream, 4)
-    jack_1 = read_int(stream, 4)
-    module_2 = read_int(stream, 4)
-    jack_2 = read_int(stream, 4)
-    return Wire(module_1, jack_1, module_2, jack_2)
+    return Wire._make(_WIRE.unpack(read_bytes(stream, _WIRE.size)))
 
 
 def write_wire(stream: BinaryIO, wire: Wire) -> None:
-    write_int(stream, wire.module_1, 4)
-    write_int(stream, wire.jack_1, 4)
-    write_int(stream, wire.module_2, 4)
-    write_int(stream, wire.jack_2, 4)
+    write_bytes(stream, _WIRE.pack(*wire))
 
 
 def _read_solution(stream: BinaryIO, filename: Optional[str] = None) -> Solution:
@@ -187,7 +267,9 @@ def _to_stream(
                     filename = stream_name
             yield stream, filename
         elif isinstance(data, Path):
-            stream = data.open("rb")
+            # solution files are small, so read the whole file at once rather than
+            # making lots of tiny reads
+            stream = io.BytesIO(data.read_bytes())
             close = True
             if data.name.endswith(".solution"):
                 filename = data.name
@@ -223,7 +305,7 @@ def read_solutions(
                 break
 
 
-def write_solution(stream: BinaryIO, solution: Solution) -> None:
+def _write_solution(stream: BinaryIO, solution: Solution) -> None:
     write_int(stream, solution.version, 4)
     write_int(stream, solution.level_id.value, 4)
     write_string(stream, solution.name)
@@ -238,8 +320,13 @@ def write_solution(stream: BinaryIO, solution: Solution) -> None:
         write_wire(stream, wire)
 
 
+def write_solution(stream: BinaryIO, solution: Solution) -> None:
+    # serialize into memory first, so the stream only sees a single write
+    stream.write(dump_solution(solution))
+
+
 def dump_solution(solution: Solution) -> bytes:
     """Export a solution as bytes."""
     stream = io.BytesIO()
-    write_solution(stream, solution)
+    _write_solution(stream, solution)
     return stream.getvalue()
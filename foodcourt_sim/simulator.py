@@ -15,12 +15,11 @@ from .errors import (
     TimeLimitExceeded,
 )
 from .models import Direction, Position
-from .modules import MainInput, Output
+from .modules import MainInput, Module, Output
 
 if TYPE_CHECKING:
     from .entities import Entity
     from .levels import Level
-    from .modules import Module
     from .solution import Solution, Wire
 
 
@@ -104,7 +103,16 @@ class State:
     entities: dict[Position, list[Entity]] = field(
         init=False, repr=False, default_factory=dict
     )
+    # the same entity lists as self.entities, indexed by [row][column] (empty lists
+    # are kept here, but removed from self.entities)
+    grid: list[list[list[Entity]]] = field(init=False, repr=False)
     _modules_by_pos: dict[Position, Module] = field(init=False, repr=False)
+    # total number of jacks over all modules
+    num_jacks: int = field(init=False, repr=False)
+    # modules that override Module.tick()
+    ticking_modules: list[Module] = field(init=False, repr=False)
+    # modules that have any jacks
+    signal_modules: list[Module] = field(init=False, repr=False)
 
     time: int = 0
     # whether the target product has been sent to the output
@@ -114,9 +122,20 @@ class State:
     )
 
     def __post_init__(self) -> None:
+        self.grid = [[[] for _ in range(6)] for _ in range(7)]
         self._modules_by_pos = {
             module.floor_position: module for module in self.modules if module.on_floor
         }
+        self.num_jacks = 0
+        for module in self.modules:
+            module.jack_offset = self.num_jacks
+            self.num_jacks += len(module.jacks)
+        for (module, idx), target in self.wire_map.items():
+            module.wire_targets[idx] = target
+        self.ticking_modules = [
+            module for module in self.modules if type(module).tick is not Module.tick
+        ]
+        self.signal_modules = [module for module in self.modules if module.jacks]
 
     @classmethod
     def from_solution(cls, solution: Solution, order_index: int) -> State:
@@ -165,15 +184,21 @@ class State:
 
     def add_entity(self, entity: Entity) -> None:
         """Add an entity to the position map."""
-        if entity.position not in self.entities:
-            self.entities[entity.position] = []
-        self.entities[entity.position].append(entity)
+        pos = entity.position
+        assert 0 <= pos.column < 6 and 0 <= pos.row < 7, f"off-board position {pos}"
+        ents = self.grid[pos.row][pos.column]
+        if not ents:
+            self.entities[pos] = ents
+        ents.append(entity)
 
     def remove_entity(self, entity: Entity) -> None:
         """Remove an entity from the position map. Also clears the entity's position."""
-        self.entities[entity.position].remove(entity)
-        if not self.entities[entity.position]:
-            del self.entities[entity.position]
+        pos = entity.position
+        assert 0 <= pos.column < 6 and 0 <= pos.row < 7, f"off-board position {pos}"
+        ents = self.grid[pos.row][pos.column]
+        ents.remove(entity)
+        if not ents:
+            del self.entities[pos]
         entity.position = Position(-1, -1)
 
     def get_entity(self, pos: Position) -> Optional[Entity]:
@@ -209,10 +234,10 @@ class State:
                 module.rack_position,
                 module.debug_str(),
             )
-            for i, (jack, value) in enumerate(zip(module.jacks, module.signals.values)):
-                if not value:
+            for i, jack in enumerate(module.jacks):
+                if not (module.signal_values >> i) & 1:
                     continue
-                if (module, i) not in self.wire_map:
+                if module.wire_targets[i] is None:
                     continue
                 if jack.direction is JackDirection.OUT:
                     logger.debug("    %s >", jack.name)
@@ -228,15 +253,16 @@ class State:
     def resolve_movement(
         self,
         dest: Position,
-        moves: list[MoveEntity],
+        forced: list[MoveEntity],
+        optional: list[MoveEntity],
     ) -> None:
-        forced = [m for m in moves if m.force]
-        optional = [m for m in moves if not m.force]
-        logger.debug("Moves to %s:", dest)
-        if forced:
-            logger.debug("  forced=%s", forced)
-        if optional:
-            logger.debug("  optional=%s", optional)
+        debug = logger.isEnabledFor(logging.DEBUG)
+        if debug:
+            logger.debug("Moves to %s:", dest)
+            if forced:
+                logger.debug("  forced=%s", forced)
+            if optional:
+                logger.debug("  optional=%s", optional)
         # check for forced collisions
         if len(forced) > 1:
             raise EmergencyStop(
@@ -250,7 +276,7 @@ class State:
                 accepted = handle_moves_to_empty(dest, self, move_group)
             else:
                 accepted = module.handle_moves(self, move_group)
-            if len(forced) + len(optional) > 1 or accepted is None:
+            if debug and (len(forced) + len(optional) > 1 or accepted is None):
                 logger.debug("    accepted: %s", accepted)
             if accepted is not None:
                 self._execute_move(accepted)
@@ -260,7 +286,7 @@ class State:
     def resolve_loop(
         self,
         dests: set[Position],
-        by_dest: dict[Position, list[MoveEntity]],
+        by_dest: dict[Position, tuple[list[MoveEntity], list[MoveEntity]]],
         loop_moves: list[MoveEntity],
     ) -> None:
         assert len(set(m.dest for m in loop_moves)) == len(dests)
@@ -271,8 +297,7 @@ class State:
         do_moves = True
         logger.debug("*** Loop detected at %s ***", dests)
         for dest in dests:
-            forced = [m for m in by_dest[dest] if m.force]
-            optional = [m for m in by_dest[dest] if not m.force]
+            forced, optional = by_dest[dest]
             logger.debug("Moves to %s:", dest)
             if forced:
                 logger.debug("  forced=%s", forced)
@@ -312,7 +337,8 @@ class State:
 
     def move_entities(self, output_pos: Position) -> None:
         """Move entities around and handle collisions."""
-        by_dest: dict[Position, list[MoveEntity]] = defaultdict(list)
+        # moves grouped by destination, split into (forced, optional)
+        by_dest: dict[Position, tuple[list[MoveEntity], list[MoveEntity]]] = {}
 
         all_moves = self._queued_moves.copy()
         for move in self._queued_moves:
@@ -326,7 +352,10 @@ class State:
                     "Products cannot leave the factory.", move.source, move.dest
                 )
             # group moves by destination
-            by_dest[move.dest].append(move)
+            group = by_dest.get(move.dest)
+            if group is None:
+                group = by_dest[move.dest] = ([], [])
+            group[0 if move.force else 1].append(move)
         self._queued_moves.clear()
 
         order = order_moves(all_moves)
@@ -337,7 +366,7 @@ class State:
             if len(dests) == 1:
                 # single destination, not a loop
                 dest = next(iter(dests))
-                self.resolve_movement(dest, by_dest[dest])
+                self.resolve_movement(dest, *by_dest[dest])
             else:
                 # entity movements make a closed loop
                 loop_moves = [
@@ -354,11 +383,18 @@ class State:
                 raise InternalSimulationError("Unhandled entity collision", dest)
 
     def propagate_signals(self) -> None:
-        for module in self.modules:
-            if not module.jacks:
-                continue
+        for module in self.signal_modules:
             # commit pending signal values
-            module.signals.update()
+            module.commit_signals()
+
+
+# move priority: down, right, left, up
+_EMPTY_MOVE_PRIORITY = {
+    Direction.DOWN: 0,
+    Direction.RIGHT: 1,
+    Direction.LEFT: 2,
+    Direction.UP: 3,
+}
 
 
 def handle_moves_to_empty(
@@ -381,9 +417,7 @@ def handle_moves_to_empty(
                 "These products have collided.", dest, *[m.source for m in moves]
             )
         return moves[0]
-    # move priority: down, right, left, up
-    priority = [Direction.DOWN, Direction.RIGHT, Direction.LEFT, Direction.UP]
-    return min(moves, key=lambda m: priority.index(m.direction))
+    return min(moves, key=lambda m: _EMPTY_MOVE_PRIORITY[m.direction])
 
 
 def order_moves(all_moves: list[MoveEntity]) -> list[set[Position]]:
@@ -494,6 +528,9 @@ before first tick, do last step with main input signals turned on
 
 # maximum length of a cycle to detect (keeps memory usage bounded)
 _MAX_CYCLE_LENGTH = 1000
+# skip calling tick() on modules that won't do anything (set to False to tick
+# every module unconditionally when debugging)
+_SKIP_IDLE_MODULES = True
 
 
 def simulate_order(
@@ -522,8 +559,9 @@ def simulate_order(
                 state.debug_log()
                 while True:
                     state.time += 1
-                    for module in state.modules:
-                        module.tick(state)
+                    for module in state.ticking_modules:
+                        if not _SKIP_IDLE_MODULES or module.wants_tick(state):
+                            module.tick(state)
                     state.move_entities(output.floor_position)
                     for module in state.modules:
                         module.update_signals(state)
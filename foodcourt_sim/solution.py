@@ -188,13 +188,16 @@ class Solution:  # pylint: disable=too-many-instance-attributes
         """Normalize the internals so identical-appearing solutions export to
         identical files (excluding wire layering).
         """
-        modules = [m.copy(self.level) for m in self.modules]
         # set unused positions to (1000, 0) (the game already does this sometimes)
-        for module in modules:
+        # (positions are part of the module hash, so they can't be changed in-place)
+        modules = []
+        for module in self.modules:
+            changes = {}
             if not module.on_rack:
-                module.rack_position = Position(1000, 0)
+                changes["rack_position"] = Position(1000, 0)
             if not module.on_floor:
-                module.floor_position = Position(1000, 0)
+                changes["floor_position"] = Position(1000, 0)
+            modules.append(module.copy(self.level, **changes))
 
         # mapping from module output jacks to module with connected input jack
         wire_map: dict[Module, dict[int, tuple[Module, int]]] = defaultdict(dict)
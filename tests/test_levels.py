@@ -11,6 +11,7 @@ from foodcourt_sim.entities import (
     PizzaDough,
     SushiBowl,
     SushiPlate,
+    pack_colors,
 )
 from foodcourt_sim.enums import EntityId, LevelId, ModuleId, PaintColor, ToppingId
 from foodcourt_sim.levels import BUYABLE_MODULES, BY_ID, build_burger, multitray, tray
@@ -110,10 +111,10 @@ def test_soda_trench():
     orders = [Entity(E.TRAY), *level.order_products]
 
     # fmt: off
-    assert tray(PaintableCup(stack=Entity(E.LID), contents=Counter({T.COLA: 2}), colors=[PaintColor.RED,   PaintColor.WHITE, PaintColor.RED])) == orders[1]
-    assert tray(PaintableCup(stack=Entity(E.LID), contents=Counter({T.COLA: 2}), colors=[PaintColor.WHITE, PaintColor.WHITE, PaintColor.RED])) == orders[2]
-    assert tray(PaintableCup(stack=Entity(E.LID), contents=Counter({T.COLA: 2}), colors=[PaintColor.RED,   PaintColor.WHITE, PaintColor.BLUE])) == orders[3]
-    assert tray(PaintableCup(stack=Entity(E.LID), contents=Counter({T.COLA: 2}), colors=[PaintColor.WHITE, PaintColor.WHITE, PaintColor.BLUE])) == orders[4]
+    assert tray(PaintableCup(stack=Entity(E.LID), contents=Counter({T.COLA: 2}), colors=pack_colors([PaintColor.RED,   PaintColor.WHITE, PaintColor.RED]))) == orders[1]
+    assert tray(PaintableCup(stack=Entity(E.LID), contents=Counter({T.COLA: 2}), colors=pack_colors([PaintColor.WHITE, PaintColor.WHITE, PaintColor.RED]))) == orders[2]
+    assert tray(PaintableCup(stack=Entity(E.LID), contents=Counter({T.COLA: 2}), colors=pack_colors([PaintColor.RED,   PaintColor.WHITE, PaintColor.BLUE]))) == orders[3]
+    assert tray(PaintableCup(stack=Entity(E.LID), contents=Counter({T.COLA: 2}), colors=pack_colors([PaintColor.WHITE, PaintColor.WHITE, PaintColor.BLUE]))) == orders[4]
     assert tray(Cup(stack=Entity(E.LID), contents=Counter({T.COLA: 2}))) != orders[1]
     assert tray(Cup(stack=Entity(E.LID), contents=Counter({T.COLA: 2}))) != orders[1]
     # fmt: on
@@ -1,8 +1,22 @@
 # pylint: disable-next=unused-wildcard-import, wildcard-import
 from collections import Counter
 
-from foodcourt_sim.enums import EntityId, ToppingId
-from foodcourt_sim.modules import Cup
+import pytest
+from foodcourt_sim.entities import Entity, PaintableCup, pack_colors
+from foodcourt_sim.enums import (
+    EntityId,
+    LevelId,
+    ModuleId,
+    OperationId,
+    PaintColor,
+    ToppingId,
+)
+from foodcourt_sim.errors import EmergencyStop
+from foodcourt_sim.levels import BY_ID
+from foodcourt_sim.models import Direction, Position
+from foodcourt_sim.modules import Cooker, Cup, FluidCoater
+from foodcourt_sim.operations import CookFryer
+from foodcourt_sim.simulator import MoveEntity, State
 
 E = EntityId
 T = ToppingId
@@ -14,3 +28,64 @@ def test_cup():
     assert Cup(contents=Counter({T.COFFEE: 2})) != one_coffee
     assert Cup(contents=Counter({T.COFFEE: 1, T.MILK: 1})) != one_coffee
     assert Cup(contents=Counter({T.COFFEE: 1, T.MILK: 0})) == one_coffee
+
+
+def test_paintable_cup():
+    cup = PaintableCup(
+        colors=pack_colors([PaintColor.RED, PaintColor.WHITE, PaintColor.BLUE])
+    )
+    assert [cup.get_color(i) for i in range(3)] == [
+        PaintColor.RED,
+        PaintColor.WHITE,
+        PaintColor.BLUE,
+    ]
+    assert PaintableCup() == PaintableCup(colors=pack_colors([PaintColor.WHITE] * 3))
+    assert repr(cup) == (
+        "PaintableCup(capacity=0,"
+        " colors=[PaintColor.RED, PaintColor.WHITE, PaintColor.BLUE])"
+    )
+
+
+def _place_module(module_cls, level_id, module_id, **kwargs):
+    level = BY_ID[level_id]
+    module = module_cls(
+        level, module_id, True, Position(0, 0), Position(2, 2), Direction.UP, **kwargs
+    )
+    return module, State(level, [module], {}, 0)
+
+
+def test_cooker_burn():
+    fryer, state = _place_module(Cooker, LevelId.ROSIES_DOUGHNUTS, ModuleId.FRYER)
+    dough = Entity(E.DOUGH, position=fryer.floor_position)
+    state.add_entity(dough)
+    for _ in range(5):
+        fryer.update_signals(state)
+        state.propagate_signals()
+        fryer.tick(state)
+    # dough burns after 2 fries, and isn't cooked any more once it's burnt
+    assert dough.operations == [CookFryer()] * 3
+    assert dough.cook_count(OperationId.COOK_FRYER) == 3
+    assert dough.cook_count(OperationId.COOK_GRILL) == 0
+
+
+def test_fluid_coater_double_fry():
+    coater, state = _place_module(
+        FluidCoater, LevelId.ROSIES_DOUGHNUTS, ModuleId.FLUID_COATER, input_id=0
+    )
+    source = coater.floor_position.shift_by(Direction.DOWN)
+
+    def coat(*operations):
+        dough = Entity(E.DOUGH, position=source)
+        for op in operations:
+            dough.add_operation(op)
+        return coater.handle_moves(state, [MoveEntity(dough, Direction.UP)])
+
+    # doughnuts must be fried exactly twice before they're glazed
+    assert coat(CookFryer(), CookFryer()) is not None
+    for ops in [(), (CookFryer(),), (CookFryer(), CookFryer(), CookFryer())]:
+        with pytest.raises(EmergencyStop):
+            coat(*ops)
+    # operations passed to the constructor are counted too
+    dough = Entity(E.DOUGH, operations=[CookFryer(), CookFryer()], position=source)
+    assert dough.cook_count(OperationId.COOK_FRYER) == 2
+    assert coater.handle_moves(state, [MoveEntity(dough, Direction.UP)]) is not None
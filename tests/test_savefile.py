@@ -4,6 +4,7 @@ from pathlib import Path
 
 import pytest
 from foodcourt_sim.errors import InvalidSolutionError
+from foodcourt_sim.modules import BigCounter, Painter, Sequencer, SmallCounter
 from foodcourt_sim.savefile import (
     dump_solution,
     read_solution,
@@ -53,6 +54,24 @@ def test_roundtrip(solution_path):  # pylint: disable=redefined-outer-name
     ), "round-trip from Solution to bytes to Solution failed"
 
 
+def test_roundtrip_dump(solution_path):  # pylint: disable=redefined-outer-name
+    data = solution_path.read_bytes()
+    assert dump_solution(read_solution(data)) == data
+
+
+def test_roundtrip_coverage():
+    # make sure the sample solutions exercise every precompiled layout, so
+    # test_roundtrip_dump checks all of them
+    solutions = [read_solution(path) for path in SOLUTION_FILES]
+    assert any(solution.wires for solution in solutions)
+    for cls in (Sequencer, Painter, SmallCounter, BigCounter):
+        assert any(
+            isinstance(module, cls)
+            for solution in solutions
+            for module in solution.modules
+        ), f"no sample solution contains a {cls.__name__}"
+
+
 def test_concat():
     solution_1 = read_solution(solutions_dir / "yut23/2twelve-1.solution")
     solution_2 = read_solution(solutions_dir / "yut23/bellys-1.solution")
@@ -2,7 +2,7 @@ from pathlib import Path
 from typing import Any
 
 import pytest
-from foodcourt_sim import read_solution, simulate_order, simulate_solution
+from foodcourt_sim import read_solution, simulate_order, simulate_solution, simulator
 from foodcourt_sim.errors import (
     EmergencyStop,
     InternalSimulationError,
@@ -10,6 +10,8 @@ from foodcourt_sim.errors import (
     TimeLimitExceeded,
 )
 from foodcourt_sim.models import Position
+from foodcourt_sim.modules import Module
+from foodcourt_sim.simulator import State
 from foodcourt_sim.solution import Solution
 
 solutions_dir = Path(__file__).parent / "solutions"
@@ -108,3 +110,53 @@ def test_2twelve():
     assert state.time == 8
     state = simulate_order(solution, 0, time_limit=8, debug=True)
     assert state.time == 8
+
+
+def _run_order(solution: Solution, order_index: int) -> tuple[Any, ...]:
+    time_limit = solution.time if solution.solved else 1000
+    try:
+        state = simulate_order(solution, order_index, time_limit=time_limit)
+    except SimulationError as e:
+        return (type(e), str(e))
+    return (state.time, state.successful_output)
+
+
+def test_idle_modules_skipped(monkeypatch: pytest.MonkeyPatch) -> None:
+    solution = read_solution(solutions_dir / "yut23/2twelve-1.solution")
+    ticked: list[Module] = []
+    orig_post_init = State.__post_init__
+
+    def post_init(self: State) -> None:
+        orig_post_init(self)
+        # record every tick() call, and check that idle modules aren't ticked
+        for module in self.ticking_modules:
+
+            def tick(state: State, module: Module = module, tick=module.tick) -> None:
+                assert module.wants_tick(state), f"idle module ticked: {module}"
+                ticked.append(module)
+                tick(state)
+
+            module.tick = tick  # type: ignore
+
+    monkeypatch.setattr(State, "__post_init__", post_init)
+    state = simulate_order(solution, 0, time_limit=solution.time)
+    assert ticked
+    assert len(ticked) < len(state.ticking_modules) * state.time
+
+
+@pytest.mark.parametrize(
+    "solution",
+    [
+        pytest.param(sol, id=f"{filepath.parent.name}-{filepath.stem}")
+        for filepath in sorted(solutions_dir.glob("*/*.solution"))
+        for sol in [read_solution(filepath)]
+    ],
+)
+def test_skip_idle_modules_matches(
+    solution: Solution, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    num_orders = len(solution.level.order_signals)
+    skipped = [_run_order(solution, i) for i in range(num_orders)]
+    monkeypatch.setattr(simulator, "_SKIP_IDLE_MODULES", False)
+    unskipped = [_run_order(solution, i) for i in range(num_orders)]
+    assert skipped == unskipped